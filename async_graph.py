@@ -0,0 +1,211 @@
+# Author: Joel Swenddal
+# Description: asyncio facade for DirectedGraph and UndirectedGraph
+#
+# AsyncGraph runs graph queries without blocking the event loop:
+#
+#   graph = AsyncGraph(ConcurrentGraph(g), max_concurrency=4, timeout=2.0)
+#   distances = await graph.dijkstra(0)
+#   async for vertex in graph.iter_bfs('A', chunk=500):
+#       ...
+#
+# - awaiting a method such as dijkstra() or bfs() runs it in an
+#   executor (a thread pool of its own by default), with at most
+#   max_concurrency queries running at once
+# - identical queries (same method and arguments) issued while one is
+#   still running share that computation and its result
+# - every query has an optional timeout; a query whose callers have
+#   all been cancelled or timed out is cancelled too (if it has not
+#   started running yet, it never runs)
+# - iter_dfs() / iter_bfs() run on the event loop itself and yield to
+#   it every `chunk` vertices, so they can be cancelled at any point.
+#   On a ConcurrentGraph they traverse its snapshot(), since its own
+#   iter_* methods run the whole traversal before returning
+#
+# Queries run in other threads, so the wrapped graph must either not
+# change while queries are running, or be a ConcurrentGraph or a
+# frozen graph (see freeze()).
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from concurrent_graph import WRITE_METHODS, ConcurrentGraph
+
+
+class AsyncGraph:
+    """
+    Class to implement an asyncio view of a graph
+    - methods of the wrapped graph become coroutine functions
+      with the same arguments
+    - results of shared queries are the same object for every
+      caller and must not be modified
+    - changes made through the facade (add_edge(), ...) are
+      never shared, and queries issued after a change do not
+      join queries started before it
+    """
+
+    def __init__(self, graph, max_concurrency=4, timeout=None, executor=None):
+        """
+        Wraps graph. timeout is the default per-query limit in
+        seconds (None for no limit) and executor a
+        concurrent.futures executor (None to use a thread pool
+        of max_concurrency threads, shut down by close()).
+        """
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+        self._graph = graph
+        self._executor = executor
+        self._own_executor = executor is None
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._slots = None
+        # (generation, method, args, kwargs) -> [task, number of waiters]
+        self._running = {}
+        self._generation = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # created on first use, inside the running event loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._slots
+
+    def close(self) -> None:
+        """
+        Shuts down the thread pool created by the facade (an
+        executor passed in is left to its owner)
+        """
+        if self._own_executor and self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+        return None
+
+    async def _run(self, func):
+        """
+        Runs func() in the executor once a concurrency slot
+        is free
+        """
+        async with self._semaphore():
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_concurrency)
+            future = self._executor.submit(func)
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                # a query already running in a thread cannot be stopped;
+                # keep its slot until it ends so the limit still holds
+                if not future.cancel():
+                    try:
+                        await asyncio.wrap_future(future)
+                    except Exception:
+                        pass
+                raise
+
+    async def query(self, name: str, *args, timeout=None, **kwargs):
+        """
+        Runs graph method `name` with the given arguments and
+        returns its result. Joins an identical query that is
+        already running. timeout overrides the default limit.
+        Raises asyncio.TimeoutError if the limit is exceeded.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        func = partial(getattr(self._graph, name), *args, **kwargs)
+
+        if name in WRITE_METHODS:
+            self._generation += 1
+            return await asyncio.wait_for(self._run(func), timeout)
+
+        key = (self._generation, name, args, tuple(sorted(kwargs.items())))
+        try:
+            entry = self._running.get(key)
+        except TypeError:
+            # unhashable arguments (e.g. a path list): not shared
+            return await asyncio.wait_for(self._run(func), timeout)
+        if entry is None:
+            task = asyncio.ensure_future(self._run(func))
+            entry = self._running[key] = [task, 0]
+            task.add_done_callback(lambda _: self._forget(key, task))
+        task = entry[0]
+
+        entry[1] += 1
+        try:
+            # shield: one caller giving up must not cancel the
+            # computation the other callers are waiting for
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                task.cancel()
+                # a cancelled task may still be waiting for its thread;
+                # later identical queries must start a new one
+                if self._running.get(key) is entry:
+                    del self._running[key]
+
+    def _forget(self, key, task) -> None:
+        """
+        Drops a finished query from the table of running ones
+        """
+        if not task.cancelled():
+            # mark any exception as seen, in case every caller left
+            task.exception()
+        entry = self._running.get(key)
+        if entry is not None and entry[0] is task:
+            del self._running[key]
+
+    async def _iter(self, name, v_start, chunk, kwargs):
+        """
+        Async generator over graph method `name`, yielding to
+        the event loop after every chunk vertices
+        """
+        if chunk < 1:
+            raise ValueError('chunk must be at least 1')
+        graph = self._graph
+        if isinstance(graph, ConcurrentGraph):
+            # a frozen copy can be traversed lazily without the lock;
+            # building it may take a while, so not on the event loop
+            graph = await self._run(graph.snapshot)
+        count = 0
+        for item in getattr(graph, name)(v_start, **kwargs):
+            yield item
+            count += 1
+            if count == chunk:
+                count = 0
+                await asyncio.sleep(0)
+
+    def iter_dfs(self, v_start, chunk=1000, **kwargs):
+        """
+        Async generator version of the graph's iter_dfs(),
+        run on the event loop, which it yields to every chunk
+        vertices. Other keyword arguments are passed through.
+        """
+        return self._iter('iter_dfs', v_start, chunk, kwargs)
+
+    def iter_bfs(self, v_start, chunk=1000, **kwargs):
+        """
+        Async generator version of the graph's iter_bfs()
+        (see iter_dfs())
+        """
+        return self._iter('iter_bfs', v_start, chunk, kwargs)
+
+    def __getattr__(self, name):
+        """
+        Returns graph method `name` as a coroutine function
+        (see query()). Wrappers are stored on the instance, so
+        this runs once per name.
+        """
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        attr = getattr(self._graph, name)
+        if not callable(attr):
+            return attr
+
+        async def method(*args, **kwargs):
+            return await self.query(name, *args, **kwargs)
+
+        method.__name__ = name
+        method.__doc__ = attr.__doc__
+        setattr(self, name, method)
+
+        return method
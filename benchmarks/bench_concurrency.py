@@ -0,0 +1,188 @@
+# Description: Stress benchmark for ConcurrentGraph
+#
+# Runs reader threads issuing bfs() / dijkstra() queries against a
+# random graph while a writer thread keeps adding and removing edges
+# (and, for the undirected graph, removing and re-adding vertices).
+# Reports query throughput with no writer, with the writer going
+# through the reader-writer lock, and with readers querying frozen
+# snapshot() copies. Every query result is checked to be a complete
+# traversal of one consistent state, and the script exits non-zero
+# if a reader raises or sees a torn result.
+#
+#   python benchmarks/bench_concurrency.py [--vertices 2000] [--readers 4]
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from concurrent_graph import ConcurrentGraph   # noqa: E402
+from d_graph import DirectedGraph              # noqa: E402
+from ud_graph import UndirectedGraph           # noqa: E402
+
+
+def directed_graph(n, degree, seed):
+    """
+    Random directed graph on the sparse backend with a
+    0 -> 1 -> ... -> n - 1 chain the writer never touches,
+    so every vertex stays reachable from vertex 0
+    """
+    rng = random.Random(seed)
+    edges = [(i, i + 1, 1) for i in range(n - 1)]
+    edges += [(i, rng.randrange(n), rng.randint(1, 9))
+              for i in range(n) for _ in range(degree - 1)]
+    edges = [(u, v, w) for u, v, w in edges if u != v]
+    return DirectedGraph(edges, backend='sparse')
+
+
+def undirected_graph(n, degree, seed):
+    """
+    Random undirected graph with a v0 - v1 - ... chain;
+    the writer only removes vertices off the chain
+    """
+    rng = random.Random(seed)
+    names = [f'v{i}' for i in range(n)]
+    edges = [(names[i], names[i + 1]) for i in range(n - 1)]
+    edges += [(names[i], names[rng.randrange(n)])
+              for i in range(n) for _ in range(degree - 1)]
+    return UndirectedGraph([(u, v) for u, v in edges if u != v])
+
+
+def directed_writer(graph, n, rng):
+    """
+    Returns a function applying one random edge update
+    (never on the chain edges)
+    """
+    def update():
+        src, dst = rng.randrange(n), rng.randrange(n)
+        if dst == src + 1 or src == dst:
+            return
+        if rng.random() < 0.5:
+            graph.add_edge(src, dst, rng.randint(1, 9))
+        else:
+            graph.remove_edge(src, dst)
+    return update
+
+
+def undirected_writer(graph, n, rng):
+    """
+    Returns a function applying one random update: an edge
+    insert / delete, or removing a vertex and re-attaching
+    it as a new chain end
+    """
+    extra = [n]
+
+    def update():
+        choice = rng.random()
+        u, v = f'v{rng.randrange(n)}', f'v{rng.randrange(n)}'
+        if choice < 0.45:
+            graph.add_edge(u, v)
+        elif choice < 0.9:
+            # keep the chain intact
+            if abs(int(u[1:]) - int(v[1:])) != 1:
+                graph.remove_edge(u, v)
+        else:
+            # a vertex hanging off the chain end, removed and replaced
+            old, extra[0] = f'x{extra[0]}', extra[0] + 1
+            with graph.write() as g:
+                g.remove_vertex(old)
+                g.add_edge(f'v{n - 1}', f'x{extra[0]}')
+    return update
+
+
+def run(query, check, update, readers, duration):
+    """
+    Runs `readers` threads calling query() and, if update is
+    given, one thread calling update() for `duration` seconds.
+    Returns (queries per second, updates, errors).
+    """
+    stop = threading.Event()
+    counts = [0] * readers
+    errors = []
+    updates = [0]
+
+    def reader(index):
+        rng = random.Random(index)
+        try:
+            while not stop.is_set():
+                if not check(query(rng)):
+                    errors.append('torn result')
+                    return
+                counts[index] += 1
+        except Exception as error:    # report, don't hang the benchmark
+            errors.append(repr(error))
+
+    def writer():
+        while not stop.is_set():
+            update()
+            updates[0] += 1
+            # give readers a turn between updates
+            time.sleep(0)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    if update is not None:
+        threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return sum(counts) / duration, updates[0], errors
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='query throughput under concurrent writes')
+    parser.add_argument('--vertices', type=int, default=2000)
+    parser.add_argument('--degree', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    n = args.vertices
+    failed = False
+    print(f'{n} vertices, {args.readers} reader threads, {args.duration:g}s per run')
+    print(f"{'graph':<12}{'mode':<22}{'queries/s':>12}{'updates':>10}")
+
+    cases = [
+        ('directed', directed_graph, directed_writer,
+         lambda g, rng: g.dijkstra(0),
+         # the chain keeps every vertex at a finite distance
+         lambda result: len(result) == n and max(result) < float('inf')),
+        ('undirected', undirected_graph, undirected_writer,
+         lambda g, rng: g.bfs('v0'),
+         # the chain keeps every v* vertex reachable from v0
+         lambda result: sum(name[0] == 'v' for name in result) == n),
+    ]
+
+    for label, build, make_writer, query, check in cases:
+        graph = ConcurrentGraph(build(n, args.degree, args.seed))
+        if label == 'undirected':
+            graph.add_edge(f'v{n - 1}', f'x{n}')
+        update = make_writer(graph, n, random.Random(args.seed))
+
+        modes = [
+            ('no writer', lambda rng: query(graph, rng), None),
+            ('locked + writer', lambda rng: query(graph, rng), update),
+            ('snapshot + writer', lambda rng: query(graph.snapshot(), rng), update),
+        ]
+        for mode, mode_query, mode_update in modes:
+            rate, updates, errors = run(mode_query, check, mode_update,
+                                        args.readers, args.duration)
+            print(f'{label:<12}{mode:<22}{rate:>12.1f}{updates:>10}')
+            for error in errors[:3]:
+                print(f'  ERROR: {error}')
+            failed = failed or bool(errors)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
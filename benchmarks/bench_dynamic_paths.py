@@ -0,0 +1,101 @@
+# Description: Update latency of tracked shortest paths
+#
+# Builds a weighted 2-D grid, tracks the shortest paths from a few
+# sources with track_sources(), and applies random edge updates:
+# weight decreases, insertions, weight increases and deletions.
+# Reports the average time per update for the incremental repair
+# against rerunning dijkstra() from every source, and checks that
+# the tracked distances match the recomputed ones.
+#
+#   python benchmarks/bench_dynamic_paths.py [--width 100] [--sources 4]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_shortest_paths import grid_graph     # noqa: E402
+from shortest_paths import dijkstra_search      # noqa: E402
+
+
+def random_update(graph, width, rng):
+    """
+    Returns a random (kind, src, dst, weight) update on a
+    grid edge or a new shortcut between nearby cells
+    """
+    v = rng.randrange(graph.v_count)
+    row, col = divmod(v, width)
+    kind = rng.choice(['decrease', 'insert', 'increase', 'delete'])
+    if kind == 'insert':
+        dst = min(row + rng.randint(0, 3), width - 1) * width + min(col + rng.randint(1, 3), width - 1)
+        return kind, v, dst, rng.randint(1, 9)
+
+    neighbors = graph._backend.out_edges(v)
+    dst, weight = rng.choice(neighbors)
+    if kind == 'decrease':
+        return kind, v, dst, max(1, weight - rng.randint(1, 5))
+    if kind == 'increase':
+        return kind, v, dst, weight + rng.randint(1, 20)
+    return kind, v, dst, 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='incremental vs. full shortest path update latency')
+    parser.add_argument('--width', type=int, default=100)
+    parser.add_argument('--sources', type=int, default=4)
+    parser.add_argument('--updates', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    graph = grid_graph(args.width, args.seed)
+    sources = rng.sample(range(graph.v_count), args.sources)
+
+    start = time.perf_counter()
+    graph.track_sources(sources)
+    initial = time.perf_counter() - start
+
+    times = {}
+    full_time = 0.0
+    for _ in range(args.updates):
+        kind, src, dst, weight = random_update(graph, args.width, rng)
+
+        start = time.perf_counter()
+        if weight:
+            graph.add_edge(src, dst, weight)
+        else:
+            graph.remove_edge(src, dst)
+        times.setdefault(kind, []).append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        recomputed = [dijkstra_search(s, graph._backend.out_edges)[0] for s in sources]
+        full_time += time.perf_counter() - start
+
+        for s, distances in zip(sources, recomputed):
+            tracked = graph.path_tracker.distances(s)
+            if any(tracked[v] != distances.get(v, float('inf')) for v in range(graph.v_count)):
+                print(f'MISMATCH after {kind} {src} -> {dst}: source {s}')
+                return 1
+
+    full = full_time * 1000 / args.updates
+    print(f'{graph.v_count} vertices, {args.sources} sources, {args.updates} updates')
+    print(f'initial track_sources(): {initial * 1000:.1f} ms')
+    print(f"{'update':<12}{'count':>7}{'ms/update':>12}{'full ms':>10}{'speedup':>10}")
+    for kind in ('decrease', 'insert', 'increase', 'delete'):
+        samples = times.get(kind, [])
+        if not samples:
+            continue
+        ms = sum(samples) * 1000 / len(samples)
+        print(f'{kind:<12}{len(samples):>7}{ms:>12.3f}{full:>10.2f}{full / max(ms, 1e-9):>9.0f}x')
+    print(f'vertices relabeled per update: '
+          f'{graph.path_tracker.relabeled / max(1, graph.path_tracker.updates):.1f}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# Description: Throughput of the streaming edge-list reader / writer
+#
+# Writes a random weighted edge list (plain and gzip), then loads it
+# two ways: the streaming pipeline (read_*_edges() feeding from_edges())
+# and the buffered one (parse every line into a list of tuples, then
+# call the constructor). Reports edges/s and peak traced memory.
+#
+#   python benchmarks/bench_edge_io.py [--edges 500000] [--chunk-size 1048576]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from d_graph import DirectedGraph                                       # noqa: E402
+from edge_io import read_directed_edges, read_undirected_edges, write_edges  # noqa: E402
+from ud_graph import UndirectedGraph                                    # noqa: E402
+
+
+def measure(func):
+    """
+    Runs func() twice and returns (seconds, peak traced bytes);
+    the timed run is separate because tracing slows Python down
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def buffered_directed(path):
+    edges = []
+    with open(path) as file:
+        for line in file:
+            u, v, w = line.split()
+            edges.append((int(u), int(v), int(w)))
+    return DirectedGraph(edges, backend='sparse')
+
+
+def buffered_undirected(path):
+    edges = []
+    with open(path) as file:
+        for line in file:
+            u, v, _ = line.split()
+            edges.append((u, v))
+    return UndirectedGraph(edges)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='edge-list I/O benchmark')
+    parser.add_argument('--edges', type=int, default=500000)
+    parser.add_argument('--vertices', type=int, default=100000)
+    parser.add_argument('--chunk-size', type=int, default=1 << 20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    n, m = args.vertices, args.edges
+    edges = [(rng.randrange(n), rng.randrange(n), rng.randint(1, 99)) for _ in range(m)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = os.path.join(tmp, 'edges.txt')
+        packed = os.path.join(tmp, 'edges.txt.gz')
+        chunk = args.chunk_size
+
+        cases = [
+            ('write plain', lambda: write_edges(plain, edges, chunk_size=chunk)),
+            ('write gzip', lambda: write_edges(packed, edges, chunk_size=chunk)),
+            ('read plain', lambda: sum(1 for _ in read_directed_edges(plain, chunk_size=chunk))),
+            ('read gzip', lambda: sum(1 for _ in read_directed_edges(packed, chunk_size=chunk))),
+            ('directed: streaming load',
+             lambda: DirectedGraph.from_edges(read_directed_edges(plain, chunk_size=chunk),
+                                              backend='sparse')),
+            ('directed: buffered load', lambda: buffered_directed(plain)),
+            ('undirected: streaming load',
+             lambda: UndirectedGraph.from_edges(read_undirected_edges(plain, chunk_size=chunk))),
+            ('undirected: buffered load', lambda: buffered_undirected(plain)),
+        ]
+
+        print(f'{m} edges, chunk size {chunk} bytes')
+        print(f"{'case':<28}{'seconds':>10}{'edges/s':>12}{'peak MB':>10}")
+        for name, func in cases:
+            elapsed, peak = measure(func)
+            print(f'{name:<28}{elapsed:>10.2f}{m / elapsed:>12.0f}{peak / 1e6:>10.1f}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# Description: Compares point-to-point shortest path searches
+#
+# Builds a weighted 2-D grid (a road-network stand-in) and runs
+# random src -> dst queries with dijkstra(), shortest_path(),
+# bidirectional_shortest_path() and astar_shortest_path(),
+# reporting the average number of settled (expanded) vertices
+# and the average query time for each.
+#
+#   python benchmarks/bench_shortest_paths.py [--width 200] [--queries 50]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from d_graph import DirectedGraph      # noqa: E402
+
+
+def grid_graph(width, seed):
+    """
+    width x width grid with random weights 1..9 on the edges
+    between horizontally / vertically adjacent cells (both
+    directions). Vertex id = row * width + col.
+    """
+    rng = random.Random(seed)
+    edges = []
+    for row in range(width):
+        for col in range(width):
+            v = row * width + col
+            if col + 1 < width:
+                edges.append((v, v + 1, rng.randint(1, 9)))
+                edges.append((v + 1, v, rng.randint(1, 9)))
+            if row + 1 < width:
+                edges.append((v, v + width, rng.randint(1, 9)))
+                edges.append((v + width, v, rng.randint(1, 9)))
+    return DirectedGraph(edges, backend='sparse')
+
+
+class CountingEdges:
+    """
+    Wraps a backend neighbor function and counts how many
+    vertices it was asked to expand
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+
+    def __call__(self, v):
+        self.calls += 1
+        return self.func(v)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='point-to-point shortest path benchmark')
+    parser.add_argument('--width', type=int, default=200)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    width = args.width
+    graph = grid_graph(width, args.seed)
+    backend = graph._backend
+    rng = random.Random(args.seed)
+    queries = [(rng.randrange(graph.v_count), rng.randrange(graph.v_count))
+               for _ in range(args.queries)]
+
+    def manhattan(v, dst):
+        # every edge weighs at least 1, so grid distance is admissible
+        return (abs(v // width - dst // width)
+                + abs(v % width - dst % width))
+
+    methods = {
+        'dijkstra (all vertices)': lambda s, t: graph.dijkstra(s)[t],
+        'shortest_path': lambda s, t: graph.shortest_path(s, t)[0],
+        'bidirectional_shortest_path': lambda s, t: graph.bidirectional_shortest_path(s, t)[0],
+        'astar_shortest_path': lambda s, t: graph.astar_shortest_path(s, t, manhattan)[0],
+    }
+
+    out_edges, in_edges = backend.out_edges, backend.in_edges
+    expected = None
+    print(f'{graph.v_count} vertices, {args.queries} queries')
+    print(f"{'method':<30}{'settled/query':>15}{'ms/query':>12}")
+    for name, method in methods.items():
+        backend.out_edges = counting_out = CountingEdges(out_edges)
+        backend.in_edges = counting_in = CountingEdges(in_edges)
+        start = time.perf_counter()
+        answers = [method(s, t) for s, t in queries]
+        elapsed = time.perf_counter() - start
+        backend.out_edges, backend.in_edges = out_edges, in_edges
+
+        if expected is None:
+            expected = answers
+        elif answers != expected:
+            print(f'MISMATCH: {name} returned different distances')
+            return 1
+
+        settled = (counting_out.calls + counting_in.calls) / len(queries)
+        print(f'{name:<30}{settled:>15.0f}{elapsed * 1000 / len(queries):>12.2f}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,299 @@
+# Description: Reproducible benchmark suite with a regression check
+#
+# Times the public methods of DirectedGraph and UndirectedGraph on
+# seeded synthetic graphs (see generators.py) at several sizes and
+# writes the results as JSON, including a scaling curve (time per
+# size and its log-log slope against V + E) for every graph family
+# and method.
+# compare reads two result files and flags every measurement that
+# got slower by more than a threshold, exiting non-zero if any did.
+#
+#   python benchmarks/bench_suite.py run --out before.json
+#   ... change the code ...
+#   python benchmarks/bench_suite.py run --out after.json
+#   python benchmarks/bench_suite.py compare before.json after.json
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import generators                           # noqa: E402
+from bench_traversal import best_time, slope  # noqa: E402
+from d_graph import DirectedGraph           # noqa: E402
+from ud_graph import UndirectedGraph        # noqa: E402
+
+# vertices per size step; cliques are quadratic in edges, so smaller
+SIZES = {'default': [500, 1000, 2000, 4000], 'clique': [50, 100, 200, 400]}
+QUICK_SIZES = {'default': [200, 400], 'clique': [20, 40]}
+
+# number of single-edge / single-vertex updates timed per measurement
+UPDATES = 200
+
+
+def directed_cases(edges, dag_edges, backend):
+    """
+    Returns {method: (setup, run)} for DirectedGraph. setup()
+    builds fresh state outside the timed region and run(state)
+    is timed. has_cycle() runs on the acyclic dag_edges,
+    where it must scan the whole graph.
+    """
+    graph = DirectedGraph(edges, backend=backend)
+    dag = DirectedGraph(dag_edges, backend=backend)
+    n = graph.v_count
+    path = graph.dfs(0)[:50]
+    update_edges = edges[:UPDATES]
+    vertices = list(range(min(n, UPDATES)))
+
+    def fresh():
+        return DirectedGraph(edges, backend=backend)
+
+    def add_edges(g):
+        for src, dst, weight in update_edges:
+            g.add_edge(src, dst, weight + 1)
+
+    def remove_edges(g):
+        for src, dst, _ in update_edges:
+            g.remove_edge(src, dst)
+
+    def remove_vertices(g):
+        for v in vertices:
+            g.remove_vertex(v)
+
+    return {
+        'construction': (lambda: None, lambda _: DirectedGraph(edges, backend=backend)),
+        'add_edge': (fresh, add_edges),
+        'remove_edge': (fresh, remove_edges),
+        'remove_vertex': (fresh, remove_vertices),
+        'get_edges': (lambda: graph, lambda g: g.get_edges()),
+        'is_valid_path': (lambda: graph, lambda g: [g.is_valid_path(path) for _ in range(100)]),
+        'dfs': (lambda: graph, lambda g: g.dfs(0)),
+        'bfs': (lambda: graph, lambda g: g.bfs(0)),
+        'has_cycle': (lambda: dag, lambda g: g.has_cycle()),
+        'dijkstra': (lambda: graph, lambda g: g.dijkstra(0)),
+        'shortest_path': (lambda: graph, lambda g: g.shortest_path(0, n - 1)),
+        'strongly_connected_components':
+            (lambda: graph, lambda g: g.strongly_connected_components()),
+    }
+
+
+def undirected_cases(pairs, forest_pairs):
+    """
+    Returns {method: (setup, run)} for UndirectedGraph (see
+    directed_cases()). has_cycle() runs on the acyclic
+    forest_pairs, where it must scan the whole graph.
+    """
+    graph = UndirectedGraph(pairs)
+    forest = UndirectedGraph(forest_pairs)
+    path = graph.dfs('v0')[:50]
+    update_pairs = pairs[:UPDATES]
+    vertices = sorted(graph.get_vertices())[:UPDATES]
+
+    def fresh():
+        return UndirectedGraph(pairs)
+
+    def add_edges(g):
+        for u, v in update_pairs:
+            g.add_edge(v + 'x', u)
+
+    def remove_edges(g):
+        for u, v in update_pairs:
+            g.remove_edge(u, v)
+
+    def remove_vertices(g):
+        for v in vertices:
+            g.remove_vertex(v)
+
+    return {
+        'construction': (lambda: None, lambda _: UndirectedGraph(pairs)),
+        'add_edge': (fresh, add_edges),
+        'remove_edge': (fresh, remove_edges),
+        'remove_vertex': (fresh, remove_vertices),
+        'get_edges': (lambda: graph, lambda g: g.get_edges()),
+        'is_valid_path': (lambda: graph, lambda g: [g.is_valid_path(path) for _ in range(100)]),
+        'dfs': (lambda: graph, lambda g: g.dfs('v0')),
+        'bfs': (lambda: graph, lambda g: g.bfs('v0')),
+        'has_cycle': (lambda: forest, lambda g: g.has_cycle()),
+        'count_connected_components':
+            (lambda: graph, lambda g: g.count_connected_components()),
+    }
+
+
+def measure(setup, run, repeat) -> float:
+    """
+    Best time of `repeat` runs, each on a fresh setup()
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        state = setup()
+        best = min(best, best_time(lambda: run(state), 1))
+    return best
+
+
+def run_suite(args) -> dict:
+    """
+    Runs every family, size and method and returns the
+    result document
+    """
+    sizes = QUICK_SIZES if args.quick else SIZES
+    results = []
+    for family in args.families:
+        generate = generators.GENERATORS[family]
+        for n in sizes.get(family, sizes['default']):
+            pairs = generate(n, seed=args.seed)
+            graphs = {
+                'DirectedGraph': directed_cases(
+                    generators.directed(pairs, args.seed),
+                    generators.directed(pairs, args.seed, both_ways=False),
+                    args.backend),
+                'UndirectedGraph': undirected_cases(
+                    generators.undirected(pairs),
+                    generators.undirected(generators.spanning_forest(pairs))),
+            }
+            for graph_name, cases in graphs.items():
+                for method, (setup, run) in cases.items():
+                    seconds = measure(setup, run, args.repeat)
+                    results.append({'graph': graph_name, 'family': family, 'size': n,
+                                    'edges': len(pairs), 'method': method,
+                                    'seconds': seconds})
+                    print(f'{graph_name:<16}{family:<16}{n:>6} {method:<30}'
+                          f'{seconds * 1000:>10.2f} ms', file=sys.stderr)
+
+    return {
+        'meta': {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'backend': args.backend,
+            'quick': args.quick,
+        },
+        'results': results,
+        'scaling': scaling_curves(results),
+    }
+
+
+def scaling_curves(results) -> dict:
+    """
+    Groups results into one curve per graph / family / method:
+    sizes, edge counts, times and the log-log slope of time
+    against V + E (1 = linear in the size of the graph)
+    """
+    curves = {}
+    for result in results:
+        key = f"{result['graph']}/{result['family']}/{result['method']}"
+        curve = curves.setdefault(key, {'sizes': [], 'edges': [], 'seconds': []})
+        curve['sizes'].append(result['size'])
+        curve['edges'].append(result['edges'])
+        curve['seconds'].append(result['seconds'])
+
+    for curve in curves.values():
+        timed = [(n + m, t) for n, m, t in
+                 zip(curve['sizes'], curve['edges'], curve['seconds']) if t > 0]
+        if len(timed) >= 2:
+            curve['slope'] = round(slope(*zip(*timed)), 3)
+        else:
+            curve['slope'] = None
+
+    return curves
+
+
+def compare(args) -> int:
+    """
+    Prints every measurement that changed by more than the
+    threshold between two result files. Returns 1 if any
+    got slower.
+    """
+    with open(args.before) as file:
+        before = json.load(file)
+    with open(args.after) as file:
+        after = json.load(file)
+
+    def key(result):
+        return result['graph'], result['family'], result['size'], result['method']
+
+    old = {key(result): result['seconds'] for result in before['results']}
+    regressions = 0
+    improvements = 0
+    for result in after['results']:
+        previous = old.get(key(result))
+        # ignore measurements too short to time reliably
+        if previous is None or max(previous, result['seconds']) < args.min_time:
+            continue
+
+        ratio = result['seconds'] / previous if previous > 0 else float('inf')
+        if ratio > args.threshold:
+            regressions += 1
+            label = 'REGRESSION'
+        elif ratio < 1 / args.threshold:
+            improvements += 1
+            label = 'improved'
+        else:
+            continue
+        graph, family, size, method = key(result)
+        print(f'{label:<12}{graph:<16}{family:<16}{size:>6} {method:<30}'
+              f'{previous * 1000:>10.2f} -> {result["seconds"] * 1000:>8.2f} ms'
+              f'  ({ratio:.2f}x)')
+
+    for name, curve in after['scaling'].items():
+        if max(curve['seconds']) < args.min_time:
+            continue
+        previous = before['scaling'].get(name, {}).get('slope')
+        if previous is not None and curve['slope'] is not None \
+                and curve['slope'] > previous + args.slope_threshold:
+            regressions += 1
+            print(f"{'REGRESSION':<12}{name}: scaling slope {previous:.2f} -> {curve['slope']:.2f}")
+
+    print(f'{regressions} regressions, {improvements} improvements '
+          f'(threshold {args.threshold:.2f}x)')
+
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='graph ADT benchmark suite')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the suite and write JSON results')
+    run.add_argument('--out', default='-', help='output file (default: stdout)')
+    run.add_argument('--families', nargs='+', default=list(generators.GENERATORS),
+                     choices=list(generators.GENERATORS))
+    run.add_argument('--backend', default='dense',
+                     choices=['dense', 'sparse', 'numpy'])
+    run.add_argument('--repeat', type=int, default=3)
+    run.add_argument('--seed', type=int, default=1)
+    run.add_argument('--quick', action='store_true', help='small sizes only')
+
+    diff = commands.add_parser('compare', help='flag regressions between two runs')
+    diff.add_argument('before')
+    diff.add_argument('after')
+    diff.add_argument('--threshold', type=float, default=1.25,
+                      help='flag changes larger than this ratio')
+    diff.add_argument('--slope-threshold', type=float, default=0.25,
+                      help='flag scaling slopes that grew by more than this')
+    diff.add_argument('--min-time', type=float, default=0.001,
+                      help='ignore measurements shorter than this (seconds)')
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        return compare(args)
+
+    document = run_suite(args)
+    if args.out == '-':
+        json.dump(document, sys.stdout, indent=1)
+        print()
+    else:
+        with open(args.out, 'w') as file:
+            json.dump(document, file, indent=1)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# Description: Regression benchmark for dfs() / bfs() scaling
+#
+# Times a full traversal of random sparse graphs of increasing size
+# and fits the log-log slope of time vs. number of vertices. A slope
+# near 1 means the traversal is linear (the old list-membership
+# version scaled quadratically); the script exits non-zero if
+# any slope exceeds --max-slope.
+#
+#   python benchmarks/bench_traversal.py [--sizes 10000 20000 ...]
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from d_graph import DirectedGraph      # noqa: E402
+from ud_graph import UndirectedGraph   # noqa: E402
+
+
+def directed_graph(n, degree, seed):
+    """
+    Random directed graph on the sparse backend where every
+    vertex has `degree` out-edges and vertex i -> i + 1 keeps
+    the whole graph reachable from vertex 0
+    """
+    rng = random.Random(seed)
+    edges = [(i, i + 1, 1) for i in range(n - 1)]
+    edges += [(i, rng.randrange(n), rng.randint(1, 9))
+              for i in range(n) for _ in range(degree - 1)]
+    edges = [(u, v, w) for u, v, w in edges if u != v]
+    return DirectedGraph(edges, backend='sparse')
+
+
+def undirected_graph(n, degree, seed):
+    """
+    Random connected undirected graph with string vertex names
+    """
+    rng = random.Random(seed)
+    graph = UndirectedGraph()
+    for i in range(n - 1):
+        graph.add_edge(f'v{i}', f'v{i + 1}')
+    for i in range(n):
+        for _ in range(degree - 1):
+            graph.add_edge(f'v{i}', f'v{rng.randrange(n)}')
+    return graph
+
+
+def best_time(func, repeat):
+    """
+    Returns the fastest of `repeat` timed calls of func()
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def slope(sizes, times):
+    """
+    Least-squares slope of log(time) against log(size)
+    """
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(t) for t in times]
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    num = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+    den = sum((x - x_mean) ** 2 for x in xs)
+    return num / den
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='dfs() / bfs() scaling benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10000, 20000, 40000, 80000])
+    parser.add_argument('--degree', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-slope', type=float, default=1.5)
+    args = parser.parse_args()
+
+    results = {}
+    for n in args.sizes:
+        d_graph = directed_graph(n, args.degree, seed=n)
+        ud_graph = undirected_graph(n, args.degree, seed=n)
+        cases = {
+            'DirectedGraph.dfs': lambda: d_graph.dfs(0),
+            'DirectedGraph.bfs': lambda: d_graph.bfs(0),
+            'UndirectedGraph.dfs': lambda: ud_graph.dfs('v0'),
+            'UndirectedGraph.bfs': lambda: ud_graph.bfs('v0'),
+        }
+        for name, func in cases.items():
+            results.setdefault(name, []).append(best_time(func, args.repeat))
+
+    print(f"{'method':<22}" + ''.join(f'{n:>12}' for n in args.sizes) + '       slope')
+    failed = False
+    for name, times in results.items():
+        fit = slope(args.sizes, times)
+        failed = failed or fit > args.max_slope
+        row = ''.join(f'{t * 1000:>10.1f}ms' for t in times)
+        print(f'{name:<22}{row}{fit:>12.2f}')
+
+    if failed:
+        print(f'FAIL: scaling slope above {args.max_slope}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+# Description: Seeded synthetic graph generators for the benchmarks
+#
+# Each generator returns a list of (u, v) pairs over the vertices
+# 0 .. n - 1, without loops or repeated pairs, and gives the same
+# list for the same arguments and seed on every run. directed() and
+# undirected() turn a pair list into input for DirectedGraph and
+# UndirectedGraph; spanning_forest() keeps an acyclic subset of it.
+
+import random
+
+
+def erdos_renyi(n, avg_degree=4, seed=0) -> list:
+    """
+    G(n, m) random graph with m = n * avg_degree / 2 pairs
+    chosen uniformly among all pairs u < v
+    """
+    rng = random.Random(seed)
+    target = min(n * avg_degree // 2, n * (n - 1) // 2)
+    pairs = set()
+    while len(pairs) < target:
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v:
+            pairs.add((min(u, v), max(u, v)))
+    return sorted(pairs)
+
+
+def grid(n, seed=0) -> list:
+    """
+    2-D grid with about n vertices (side = floor(sqrt(n))),
+    joining horizontally and vertically adjacent cells
+    """
+    width = max(1, int(n ** 0.5))
+    pairs = []
+    for row in range(width):
+        for col in range(width):
+            v = row * width + col
+            if col + 1 < width:
+                pairs.append((v, v + 1))
+            if row + 1 < width:
+                pairs.append((v, v + width))
+    return pairs
+
+
+def barabasi_albert(n, m=2, seed=0) -> list:
+    """
+    Preferential-attachment (power-law degree) graph: each
+    new vertex joins m existing vertices picked with
+    probability proportional to their degree
+    """
+    rng = random.Random(seed)
+    pairs = []
+    # every edge endpoint, so a uniform pick is degree-weighted
+    endpoints = []
+    for v in range(min(n, m + 1)):
+        for u in range(v):
+            pairs.append((u, v))
+            endpoints += [u, v]
+
+    for v in range(m + 1, n):
+        targets = set()
+        while len(targets) < m:
+            targets.add(rng.choice(endpoints))
+        for u in sorted(targets):
+            pairs.append((u, v))
+            endpoints += [u, v]
+    return pairs
+
+
+def chain(n, seed=0) -> list:
+    """
+    Path 0 - 1 - ... - n - 1 (deepest possible traversal)
+    """
+    return [(v, v + 1) for v in range(n - 1)]
+
+
+def clique(n, seed=0) -> list:
+    """
+    Complete graph on n vertices (n * (n - 1) / 2 pairs)
+    """
+    return [(u, v) for u in range(n) for v in range(u + 1, n)]
+
+
+GENERATORS = {
+    'erdos_renyi': erdos_renyi,
+    'grid': grid,
+    'barabasi_albert': barabasi_albert,
+    'chain': chain,
+    'clique': clique,
+}
+
+
+def directed(pairs, seed=0, both_ways=True) -> list:
+    """
+    (src, dst, weight) edges for DirectedGraph, with seeded
+    weights in 1..9. Each pair u < v becomes u -> v and, if
+    both_ways, also v -> u (so traversals from any vertex
+    cover its whole component); otherwise the graph is
+    acyclic, the worst case for has_cycle()
+    """
+    rng = random.Random(seed)
+    edges = []
+    for u, v in pairs:
+        edges.append((u, v, rng.randint(1, 9)))
+        if both_ways:
+            edges.append((v, u, rng.randint(1, 9)))
+    return edges
+
+
+def spanning_forest(pairs) -> list:
+    """
+    The pairs that join two previously unconnected
+    components, in order: a spanning forest of the graph,
+    which is acyclic, the worst case for has_cycle()
+    """
+    parent = {}
+
+    def find(v):
+        root = v
+        while parent.get(root, root) != root:
+            root = parent[root]
+        # path compression
+        while v != root:
+            parent[v], v = root, parent[v]
+        return root
+
+    forest = []
+    for u, v in pairs:
+        root_u, root_v = find(u), find(v)
+        if root_u != root_v:
+            parent[root_u] = root_v
+            forest.append((u, v))
+    return forest
+
+
+def undirected(pairs) -> list:
+    """
+    (u, v) pairs of string vertex names for UndirectedGraph
+    """
+    return [(f'v{u}', f'v{v}') for u, v in pairs]
@@ -0,0 +1,203 @@
+# Author: Joel Swenddal
+# Description: Thread-safe wrapper for DirectedGraph and UndirectedGraph
+#
+# ConcurrentGraph guards a graph with a reader-writer lock. Any number
+# of threads can run queries (bfs, dijkstra, ...) at the same time;
+# a method that changes the graph waits for the running queries to
+# finish and holds new ones back until it is done, so no query sees a
+# half-applied change. Waiting writers go first, so a steady stream
+# of queries cannot starve updates.
+#
+#   graph = ConcurrentGraph(UndirectedGraph(edges))
+#   graph.bfs('A')                    # shared (read) lock
+#   graph.remove_vertex('B')          # exclusive (write) lock
+#   with graph.write() as g:          # several changes as one update
+#       g.add_edge('A', 'C')
+#       g.remove_edge('A', 'D')
+#
+# For long-running readers, snapshot() returns an immutable frozen
+# copy (see freeze()) that can be queried with no locking at all. It
+# is rebuilt only after the graph has changed.
+
+import threading
+from contextlib import contextmanager
+
+# methods that change the graph and need the write lock
+WRITE_METHODS = frozenset({
+    'add_vertex', 'add_edge', 'add_edges_bulk', 'remove_edge',
+    'remove_vertex', 'compact', 'enable_path_cache', 'disable_path_cache',
+    'track_sources', 'untrack_sources', 'enable_instrumentation',
+    'disable_instrumentation'})
+
+
+class RWLock:
+    """
+    Class to implement a writer-preferring reader-writer lock
+    - any number of readers can hold it at once
+    - a writer holds it alone, and once a writer is waiting
+      no new reader gets in
+    - not reentrant: a thread holding the lock must not try
+      to acquire it again
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def reading(self):
+        """
+        Context manager holding the lock for reading
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        """
+        Context manager holding the lock for writing
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentGraph:
+    """
+    Class to implement a thread-safe view of a DirectedGraph
+    or UndirectedGraph
+    - every method of the wrapped graph is available; those
+      in WRITE_METHODS run under the write lock and all others
+      under the read lock
+    - iter_* generators are run to completion under the read
+      lock and returned as iterators over the results, since
+      a lazy traversal would outlive the lock
+    - views returned by properties (adj_list, adj_matrix) are
+      live; read them inside read() instead
+    - the wrapped graph must not be used directly while it is
+      wrapped
+    """
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._lock = RWLock()
+        # number of completed updates, and the snapshot of the
+        # graph at a given update count
+        self._updates = 0
+        self._snapshot = (None, None)
+
+    def __str__(self):
+        with self._lock.reading():
+            return str(self._graph)
+
+    @contextmanager
+    def read(self):
+        """
+        Context manager for several queries on one consistent
+        state of the graph. Yields the wrapped graph, which must
+        be used directly (calling methods of the ConcurrentGraph
+        inside the block can deadlock) and must not be changed.
+        """
+        with self._lock.reading():
+            yield self._graph
+
+    @contextmanager
+    def write(self):
+        """
+        Context manager for applying several changes as one
+        update. Yields the wrapped graph; readers see either
+        none or all of the changes made in the block.
+        """
+        with self._lock.writing():
+            try:
+                yield self._graph
+            finally:
+                self._updates += 1
+
+    def snapshot(self):
+        """
+        Returns an immutable frozen copy of the current graph,
+        which any number of threads can query without locking.
+        The copy is reused until the graph changes.
+        """
+        updates, frozen = self._snapshot
+        if updates == self._updates:
+            return frozen
+
+        with self._lock.reading():
+            updates = self._updates
+            frozen = self._graph.freeze()
+        self._snapshot = (updates, frozen)
+
+        return frozen
+
+    def __getattr__(self, name):
+        """
+        Forwards attribute access to the wrapped graph, wrapping
+        methods so they run under the right lock. Method wrappers
+        are stored on the instance, so this runs once per name.
+        """
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        with self._lock.reading():
+            attr = getattr(self._graph, name)
+        if not callable(attr):
+            return attr
+
+        graph = self._graph
+        lock = self._lock
+
+        if name in WRITE_METHODS:
+            def method(*args, **kwargs):
+                with lock.writing():
+                    try:
+                        return getattr(graph, name)(*args, **kwargs)
+                    finally:
+                        self._updates += 1
+        elif name.startswith('iter_'):
+            def method(*args, **kwargs):
+                with lock.reading():
+                    return iter(list(getattr(graph, name)(*args, **kwargs)))
+        else:
+            def method(*args, **kwargs):
+                with lock.reading():
+                    return getattr(graph, name)(*args, **kwargs)
+
+        method.__name__ = name
+        method.__doc__ = attr.__doc__
+        setattr(self, name, method)
+
+        return method
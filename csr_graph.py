@@ -0,0 +1,305 @@
+# Author: Joel Swenddal
+# Description: Compact read-only compressed sparse row (CSR)
+#              storage for directed and undirected graphs
+
+import threading
+from array import array
+from bisect import bisect_left
+
+from graph_backends import _DenseView
+
+
+class CSRGraph:
+    """
+    Class to implement a read-only directed weighted graph
+    stored in compressed sparse row form
+    - out-edges of vertex v are targets[offsets[v]:offsets[v + 1]]
+      with matching weights, sorted by target
+    - arrays are typed (array module or memoryview), so a
+      snapshot is small to pickle and cheap to send to worker
+      processes, and can be memory-mapped from a file
+    - implements the storage backend interface, so
+      DirectedGraph(backend=csr) answers every query method;
+      changing the graph raises TypeError
+    """
+    name = 'csr'
+
+    def __init__(self, v_count, offsets, targets, weights):
+        """
+        Store graph info as CSR arrays (see from_edges())
+        """
+        self.v_count = v_count
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        # reverse CSR (in-edges), built on first use under the lock,
+        # since readers in several threads may need it at once
+        self._reverse = None
+        self._reverse_lock = threading.Lock()
+
+    def __getstate__(self):
+        # memoryviews cannot be pickled; send plain arrays instead
+        state = dict(self.__dict__)
+        for key in ('offsets', 'targets', 'weights'):
+            if isinstance(state[key], memoryview):
+                state[key] = array(state[key].format, state[key])
+        state['_reverse'] = None
+        del state['_reverse_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reverse_lock = threading.Lock()
+
+    @classmethod
+    def from_edges(cls, v_count, edges):
+        """
+        Builds a snapshot from an iterable of (src, dst, weight)
+        tuples given in row-major order (sorted by src, then dst)
+        """
+        offsets = array('q', [0]) * (v_count + 1)
+        targets = array('i')
+        weight_list = []
+
+        for src, dst, weight in edges:
+            offsets[src + 1] += 1
+            targets.append(dst)
+            weight_list.append(weight)
+
+        # turn per-vertex counts into running offsets
+        for v in range(v_count):
+            offsets[v + 1] += offsets[v]
+
+        if all(isinstance(weight, int) for weight in weight_list):
+            weights = array('q', weight_list)
+        else:
+            weights = array('d', weight_list)
+
+        return cls(v_count, offsets, targets, weights)
+
+    @property
+    def e_count(self) -> int:
+        """
+        Number of edges in the graph
+        """
+        return len(self.targets)
+
+    def out_degrees(self) -> array:
+        """
+        Returns the out-degree of every vertex
+        """
+        return _row_lengths(self.offsets)
+
+    def in_degrees(self) -> array:
+        """
+        Returns the in-degree of every vertex
+        """
+        degrees = array('i', [0]) * self.v_count
+        for dst in self.targets:
+            degrees[dst] += 1
+        return degrees
+
+    def content_key(self) -> tuple:
+        """
+        Returns a hashable value that is equal for two
+        snapshots exactly when they hold the same graph
+        """
+        return (self.v_count, bytes(self.offsets), bytes(self.targets),
+                tuple(self.weights))
+
+    @property
+    def matrix(self):
+        """
+        Returns a read-only, row-by-row dense view of the
+        adjacency matrix (rows are built on demand)
+        """
+        return _DenseView(self)
+
+    def add_vertex(self) -> int:
+        raise TypeError('CSR graph storage is read-only')
+
+    def ensure_vertices(self, count: int) -> None:
+        if count > self.v_count:
+            raise TypeError('CSR graph storage is read-only')
+
+    def set_weight(self, src: int, dst: int, weight) -> None:
+        raise TypeError('CSR graph storage is read-only')
+
+    def get_weight(self, src: int, dst: int):
+        """
+        Returns the weight of edge src -> dst, or 0 if there
+        is no such edge (binary search in the row of src)
+        """
+        if src < 0:
+            src += self.v_count
+        if dst < 0:
+            dst += self.v_count
+
+        start, end = self.offsets[src], self.offsets[src + 1]
+        index = bisect_left(self.targets, dst, start, end)
+        if index < end and self.targets[index] == dst:
+            return self.weights[index]
+        return 0
+
+    def successors(self, v: int) -> list:
+        """
+        Returns the out-neighbors of v in ascending order
+        """
+        return self.targets[self.offsets[v]:self.offsets[v + 1]].tolist()
+
+    def out_edges(self, v: int) -> list:
+        """
+        Returns (neighbor, weight) pairs for the out-edges
+        of v in ascending neighbor order
+        """
+        start, end = self.offsets[v], self.offsets[v + 1]
+        return list(zip(self.targets[start:end], self.weights[start:end]))
+
+    def in_edges(self, v: int) -> list:
+        """
+        Returns (neighbor, weight) pairs for the in-edges
+        of v in ascending neighbor order. The reverse index
+        is built (O(V + E)) the first time this is called.
+        """
+        return self.reverse().out_edges(v)
+
+    def reverse(self):
+        """
+        Returns the CSR snapshot of the reversed graph (the
+        in-edges of every vertex), built on the first call
+        with a counting sort (O(V + E))
+        """
+        if self._reverse is not None:
+            return self._reverse
+
+        with self._reverse_lock:
+            if self._reverse is None:
+                self._reverse = self._build_reverse()
+
+        return self._reverse
+
+    def _build_reverse(self):
+        """
+        Builds the reversed CSR: the edges are bucketed by
+        target, and visiting the sources in ascending order
+        leaves every reversed row sorted
+        """
+        v_count, offsets, targets, weights = \
+            self.v_count, self.offsets, self.targets, self.weights
+
+        reverse_offsets = array('q', [0]) * (v_count + 1)
+        for dst in targets:
+            reverse_offsets[dst + 1] += 1
+        for v in range(v_count):
+            reverse_offsets[v + 1] += reverse_offsets[v]
+
+        # next free slot in each reversed row
+        slots = array('q', reverse_offsets[:v_count])
+        sources = array('i', [0]) * len(targets)
+        reverse_weights = array(weights.format if isinstance(weights, memoryview)
+                                else weights.typecode, [0]) * len(targets)
+        for src in range(v_count):
+            for index in range(offsets[src], offsets[src + 1]):
+                dst = targets[index]
+                slot = slots[dst]
+                sources[slot] = src
+                reverse_weights[slot] = weights[index]
+                slots[dst] = slot + 1
+
+        return CSRGraph(v_count, reverse_offsets, sources, reverse_weights)
+
+    def edges(self):
+        """
+        Yields (src, dst, weight) for every edge in
+        row-major order
+        """
+        for src in range(self.v_count):
+            for dst, weight in self.out_edges(src):
+                yield (src, dst, weight)
+
+    def row(self, v: int) -> list:
+        """
+        Returns row v of the adjacency matrix as a dense list
+        """
+        dense_row = [0] * self.v_count
+        for dst, weight in self.out_edges(v):
+            dense_row[dst] = weight
+        return dense_row
+
+
+class CSRAdjacency:
+    """
+    Read-only adjacency for an undirected graph in CSR form,
+    used in place of UndirectedGraph's list of NeighborSets.
+    Vertex ids must be numbered in name order, so each
+    neighbor slice (sorted by id) is also in name order.
+    """
+
+    def __init__(self, offsets, targets):
+        self.offsets = offsets
+        self.targets = targets
+
+    def __getstate__(self):
+        # memoryviews cannot be pickled; send plain arrays instead
+        return {key: array(value.format, value) if isinstance(value, memoryview) else value
+                for key, value in self.__dict__.items()}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def degrees(self) -> array:
+        """
+        Returns the degree of every vertex
+        """
+        return _row_lengths(self.offsets)
+
+    def content_key(self) -> tuple:
+        """
+        Returns a hashable value for the stored adjacency
+        """
+        return (bytes(self.offsets), bytes(self.targets))
+
+    def __getitem__(self, v_id):
+        return CSRNeighbors(self.targets[self.offsets[v_id]:self.offsets[v_id + 1]])
+
+    def __iter__(self):
+        for v_id in range(len(self)):
+            yield self[v_id]
+
+
+class CSRNeighbors:
+    """
+    Read-only NeighborSet stand-in over one slice of a CSR
+    targets array (ascending ids)
+    """
+    __slots__ = ('ids',)
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def __contains__(self, item):
+        ids = self.ids
+        index = bisect_left(ids, item)
+        return index < len(ids) and ids[index] == item
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __bool__(self):
+        return len(self.ids) > 0
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def ordered(self, key):
+        """
+        Returns the ids, which are already in name order
+        """
+        return self.ids
+
+
+def _row_lengths(offsets) -> array:
+    """
+    Returns the length of every CSR row given its offsets
+    """
+    return array('i', [offsets[v + 1] - offsets[v] for v in range(len(offsets) - 1)])
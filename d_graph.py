@@ -1,8 +1,22 @@
 # Author: Joel Swenddal
 # Description: Directed Graph Implementation -- using Adjacency Matrix
 
-import heapq
-from collections import deque
+try:
+    import numpy as np
+except ImportError:     # numpy is only needed for array results
+    np = None
+
+from csr_graph import CSRGraph
+from dynamic_paths import DynamicShortestPaths
+from graph_backends import make_backend
+from graph_traversal import (find_directed_cycle, iter_bfs, iter_dfs,
+                             strongly_connected_components)
+from instrumentation import Instrumentation
+from path_validation import validate_directed
+from reachability import ReachabilityIndex
+from shortest_paths import (ShortestPathCache, astar_search, bidirectional_search,
+                            dijkstra_search, floyd_warshall, multi_source_distances,
+                            reconstruct_path)
 
 
 class DirectedGraph:
@@ -14,24 +28,44 @@ class DirectedGraph:
     - vertex names are integers
     """
 
-    def __init__(self, start_edges=None):
+    def __init__(self, start_edges=None, backend='dense'):
         """
-        Store graph info as adjacency matrix
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Store graph info in the selected storage backend:
+        'dense' (adjacency matrix), 'sparse' (per-vertex
+        dictionaries of out-edges) or 'numpy' (NumPy matrix)
         """
-        self.v_count = 0
-        self.adj_matrix = []
-
-        # populate graph with initial vertices and edges (if provided)
-        # before using, implement add_vertex() and add_edge() methods
+        self._backend = make_backend(backend)
+
+        # bumped by every mutation; used to invalidate cached results
+        self.version = 0
+        self.path_cache = None
+        self.path_tracker = None
+        self.reachability = None
+        self.instrumentation = None
+        # ids of removed vertices (tombstones), reused by add_vertex()
+        self._removed = set()
+        self._free_ids = []
+        # fraction of removed ids at which remove_vertex() compacts
+        self.compact_threshold = None
+        # (version, edge index) for validate_paths()
+        self._path_index = None
+
+        # populate graph with initial vertices and edges (if provided);
+        # a graph built from start_edges always has at least vertex 0
         if start_edges is not None:
-            v_count = 0
-            for u, v, _ in start_edges:
-                v_count = max(v_count, u, v)
-            for _ in range(v_count + 1):
-                self.add_vertex()
-            for u, v, weight in start_edges:
-                self.add_edge(u, v, weight)
+            self.add_vertex()
+            self.add_edges_bulk(start_edges)
+
+    @classmethod
+    def from_edges(cls, edges, backend='dense'):
+        """
+        Builds a graph from any iterable (including generators)
+        of (src, dst, weight) tuples in a single pass. See
+        add_edges_bulk().
+        """
+        graph = cls(backend=backend)
+        graph.add_edges_bulk(edges)
+        return graph
 
     def __str__(self):
         """
@@ -50,26 +84,55 @@ class DirectedGraph:
         out = f"GRAPH ({self.v_count} vertices):\n{out}"
         return out
 
+    @property
+    def v_count(self) -> int:
+        """
+        Number of vertex ids in use (0 .. v_count - 1),
+        including removed vertices whose ids have not been
+        reused or compacted away yet
+        """
+        return self._backend.v_count
+
+    @property
+    def adj_matrix(self):
+        """
+        Adjacency matrix of the graph. For the dense backend
+        this is the live list of lists and for the NumPy backend
+        a live array view; the sparse backend returns a read-only
+        view that builds rows on demand as tuples.
+        """
+        return self._backend.matrix
+
+    @property
+    def backend(self) -> str:
+        """
+        Name of the storage backend in use
+        """
+        return self._backend.name
+
     # ------------------------------------------------------------------ #
 
     def add_vertex(self) -> int:
         """
         Adds a new vertex to the graph. Returns
         an integer representing the updated number of
-        integers in the graph.
+        integers in the graph. The new vertex takes the most
+        recently removed id if there is one (see
+        remove_vertex()), otherwise the id v_count - 1.
+        Either way the result is the new vertex's id plus
+        one, so add_vertex() - 1 is always the new id; it is
+        the number of vertices only while no removed id is
+        waiting to be reused.
         """
-        self.v_count += 1
-
-        new_node = [0 for each in range(0, self.v_count)]
-
-        self.adj_matrix.append(new_node)
-
-        if self.v_count > 1:
-            for node in self.adj_matrix:
-                if len(node) < self.v_count:
-                    for index in range(len(node), self.v_count):
-                        node.append(0)
-
+        self.version += 1
+        if self._free_ids:
+            v = self._free_ids.pop()
+            self._removed.discard(v)
+            return v + 1
+
+        self._backend.add_vertex()
+        if self.path_tracker is not None:
+            self.path_tracker.vertex_added()
         return self.v_count
 
     def add_edge(self, src: int, dst: int, weight=1) -> None:
@@ -80,8 +143,47 @@ class DirectedGraph:
         """
         if (src >= self.v_count) or (dst >= self.v_count) or (weight < 1) or (src == dst):
             return None
+        if self._removed and (src % self.v_count in self._removed
+                              or dst % self.v_count in self._removed):
+            return None
 
-        self.adj_matrix[src][dst] = weight
+        self._set_weight(src, dst, weight)
+
+        return None
+
+    def add_edges_bulk(self, edges) -> None:
+        """
+        Adds edges from any iterable (including generators) of
+        (src, dst, weight) tuples in a single pass. Vertices
+        up to the largest id seen are created as needed, with
+        storage grown in one step per new largest id rather
+        than one add_vertex() call per vertex. Edges that
+        add_edge() would reject (loops, weights below 1,
+        negative ids, removed vertices) are skipped; a
+        repeated edge keeps the last weight given.
+        """
+        backend = self._backend
+        set_weight = backend.set_weight
+        v_count = backend.v_count
+        removed = self._removed
+
+        for src, dst, weight in edges:
+            if src < 0 or dst < 0:
+                continue
+            if src >= v_count or dst >= v_count:
+                v_count = max(src, dst) + 1
+                backend.ensure_vertices(v_count)
+            if weight < 1 or src == dst:
+                continue
+            if removed and (src in removed or dst in removed):
+                continue
+            set_weight(src, dst, weight)
+
+        self.version += 1
+        # many edges may have changed: recompute the tracked paths
+        if self.path_tracker is not None:
+            self.path_tracker.v_count = backend.v_count
+            self.path_tracker.rebuild()
 
         return None
 
@@ -94,7 +196,94 @@ class DirectedGraph:
         if (src < 0) or (dst < 0) or (src == dst) or (src >= self.v_count) or (dst >= self.v_count):
             return None
 
-        self.adj_matrix[src][dst] = 0
+        self._set_weight(src, dst, 0)
+
+        return None
+
+    def remove_vertex(self, v: int):
+        """
+        Removes vertex v and every edge to or from it. The
+        other vertices keep their ids: v is only marked as
+        removed, so every query method skips it, and its id is
+        reused by the next add_vertex(). Costs O(degree) (plus
+        a column scan on the matrix backends) instead of
+        rebuilding the matrix. If compact_threshold is set and
+        more than that fraction of the ids are removed, the
+        graph is compacted and the id map from compact() is
+        returned; otherwise returns None. Does nothing if v is
+        not in the graph.
+        """
+        if not self._has_vertex(v):
+            return None
+
+        if self.path_tracker is not None:
+            self.path_tracker.remove_source(v)
+        for dst, _ in self._backend.out_edges(v):
+            self._set_weight(v, dst, 0)
+        for src, _ in self._backend.in_edges(v):
+            self._set_weight(src, v, 0)
+        self.version += 1
+
+        self._removed.add(v)
+        self._free_ids.append(v)
+
+        if (self.compact_threshold is not None
+                and len(self._free_ids) > self.compact_threshold * self.v_count):
+            return self.compact()
+
+        return None
+
+    def compact(self) -> dict:
+        """
+        Drops the ids of removed vertices, renumbering the
+        remaining vertices 0 .. n - 1 in their current order.
+        Returns a dictionary mapping each remaining old id to
+        its new id. Tracked shortest paths are renumbered;
+        cached paths and a reachability index built before
+        become stale, as after any change.
+        """
+        removed = self._removed
+        live = [v for v in range(self.v_count) if v not in removed]
+        id_map = {old: new for new, old in enumerate(live)}
+        if not removed:
+            return id_map
+
+        self._backend.compact(live)
+        if self.path_tracker is not None:
+            self.path_tracker.renumber(id_map)
+        removed.clear()
+        self._free_ids.clear()
+        self.version += 1
+
+        return id_map
+
+    def _has_vertex(self, v: int) -> bool:
+        """
+        Returns True if v is the id of a vertex in the graph
+        (in range and not removed)
+        """
+        return 0 <= v < self.v_count and v not in self._removed
+
+    def _set_weight(self, src: int, dst: int, weight) -> None:
+        """
+        Sets the weight of edge src -> dst (0 removes it) and
+        repairs the tracked shortest paths
+        """
+        tracker = self.path_tracker
+        if tracker is None:
+            self._backend.set_weight(src, dst, weight)
+            self.version += 1
+            return None
+
+        # negative ids count from the end, as in the backends
+        if src < 0:
+            src += self.v_count
+        if dst < 0:
+            dst += self.v_count
+        old_weight = self._backend.get_weight(src, dst)
+        self._backend.set_weight(src, dst, weight)
+        self.version += 1
+        tracker.edge_changed(src, dst, old_weight, weight)
 
         return None
 
@@ -102,7 +291,8 @@ class DirectedGraph:
         """
         Returns a list of the vertices of the graph.
         """
-        vertices = [x for x in range(0, self.v_count)]
+        removed = self._removed
+        vertices = [x for x in range(0, self.v_count) if x not in removed]
         return vertices
 
     def get_edges(self) -> list:
@@ -113,19 +303,14 @@ class DirectedGraph:
         destination node index, and the third being the
         weight of the edge.
         """
+        return list(self.iter_edges())
 
-        node_index = 0
-        edge_index = 0
-        result_list = []
-
-        for node_index in range(0, self.v_count):
-            for edge_index in range(0, self.v_count):
-                if self.adj_matrix[node_index][edge_index] > 0:
-                    edge_tup = (node_index, edge_index,
-                                self.adj_matrix[node_index][edge_index])
-                    result_list.append(edge_tup)
-
-        return result_list
+    def iter_edges(self):
+        """
+        Generator version of get_edges(). Yields the same
+        (src, dst, weight) tuples in the same order.
+        """
+        return iter(self._backend.edges())
 
     def is_valid_path(self, path: list) -> bool:
         """
@@ -142,7 +327,7 @@ class DirectedGraph:
 
         # if a path node is not in the graph
         for node in path:
-            if node < 0 or node >= self.v_count:
+            if node < 0 or node >= self.v_count or node in self._removed:
                 return False
         # if only one node in path
         if path_length == 1:
@@ -159,53 +344,80 @@ class DirectedGraph:
         while next < len(path):
             step = path[current]
             next_step = path[next]
-            if self.adj_matrix[step][next_step] <= 0:
+            if self._backend.get_weight(step, next_step) <= 0:
                 return False
             current += 1
             next += 1
 
         return True
 
-    def dfs(self, v_start, v_end=None) -> list:
+    def validate_paths(self, paths, offsets=None, weights=False):
         """
-        Takes an starting vertice (v_start) and
-        an optional ending vertice (v_end) and
-        performs a depth-first search. Returns a
-        list of vertices in the order they were
-        visited.
+        Batch version of is_valid_path(). paths is a list of
+        vertex lists, or a flat array of vertices if offsets is
+        given (path i is paths[offsets[i]:offsets[i + 1]]).
+        Returns a NumPy bool array with one entry per path, or
+        (valid, totals) if weights is True, where totals holds
+        the total weight of each path (0 for paths of fewer
+        than two vertices, NaN for invalid paths). All hops
+        are checked at once with NumPy (see path_validation.py).
+        Requires NumPy.
         """
-        path_list = []
-
-        if v_start < 0 or v_start >= self.v_count:
-            return path_list
+        return validate_directed(self, paths, offsets, weights)
 
-        if v_end is None or v_end < 0 or v_end >= self.v_count:
-            v_end = None
+    def iter_dfs(self, v_start, stop=None, max_depth=None, details=False,
+                 stats=None):
+        """
+        Generator version of dfs(). Yields vertices as they are
+        visited, or (vertex, depth, parent) tuples if details
+        is True. The search ends after yielding a vertex for
+        which the optional stop predicate returns True, and
+        vertices at depth max_depth are not expanded. Yields
+        nothing if v_start is not in the graph. Counters are
+        added to the optional stats dictionary (see
+        instrumentation.py).
+        """
+        if not self._has_vertex(v_start):
+            return iter(())
 
-        if v_start == v_end:
-            path_list.append(v_start)
-            return path_list
+        return iter_dfs(v_start, self._backend.successors,
+                        stop, max_depth, details, stats)
 
-        # push starting vertice onto stack
-        current = v_start
-        stack = [current]
+    def iter_bfs(self, v_start, stop=None, max_depth=None, details=False,
+                 stats=None):
+        """
+        Generator version of bfs(). Takes the same arguments
+        as iter_dfs().
+        """
+        if not self._has_vertex(v_start):
+            return iter(())
 
-        # while stack not empty
-        while stack and current != v_end:
-            current = stack.pop()
+        return iter_bfs(v_start, self._backend.successors,
+                        stop, max_depth, details, stats)
 
-            if current not in path_list:
-                path_list.append(current)
+    def _end_predicate(self, v_end):
+        """
+        Returns a stop predicate for iter_dfs() / iter_bfs()
+        matching v_end, or None if v_end is not a vertex
+        """
+        if v_end is None or v_end < 0 or v_end >= self.v_count:
+            return None
+        return lambda vertex: vertex == v_end
 
-            # if there is a neighbor not yet in path list, push to
-            # stack in descending order (so they pop in ascending order)
-            for index in range(len(self.adj_matrix[current])-1, -1, -1):
-                if self.adj_matrix[current][index] >= 1:
-                    neighbor = index
-                    if neighbor not in path_list:
-                        stack.append(neighbor)
+    def dfs(self, v_start, v_end=None) -> list:
+        """
+        Takes an starting vertice (v_start) and
+        an optional ending vertice (v_end) and
+        performs a depth-first search. Returns a
+        list of vertices in the order they were
+        visited.
+        """
+        stop = self._end_predicate(v_end)
+        if self.instrumentation is not None:
+            return self.instrumentation.measure(
+                'dfs', lambda stats: list(self.iter_dfs(v_start, stop, stats=stats)))
 
-        return path_list
+        return list(self.iter_dfs(v_start, stop))
 
     def bfs(self, v_start, v_end=None) -> list:
         """
@@ -215,85 +427,70 @@ class DirectedGraph:
         list of vertices in the order they were
         visited.
         """
-        path_list = []
+        stop = self._end_predicate(v_end)
+        if self.instrumentation is not None:
+            return self.instrumentation.measure(
+                'bfs', lambda stats: list(self.iter_bfs(v_start, stop, stats=stats)))
 
-        if v_start < 0 or v_start >= self.v_count:
-            return path_list
-
-        if v_end is None or v_end < 0 or v_end >= self.v_count:
-            v_end = None
-
-        if v_start == v_end:
-            path_list.append(v_start)
-            return path_list
-
-        # push starting vertice onto queue (using deque)
-        current = v_start
-        queue = deque([current])
-
-        # while queue not empty
-        while queue and current != v_end:
-            current = queue.popleft()
-            if current not in path_list:
-                path_list.append(current)
-
-         # if there is a neighbor not yet in path list, push to
-            # queue in ascending order (so they pop ascending)
-            for index in range(0, len(self.adj_matrix[current])):
-                if self.adj_matrix[current][index] >= 1:
-                    neighbor = index
-                    if neighbor not in path_list:
-                        queue.append(neighbor)
-
-        return path_list
+        return list(self.iter_bfs(v_start, stop))
 
     def has_cycle(self):
         """
         Returns True if there is at least one cycle
         in the graph. Otherwise, returns False.
         """
-        explored_list = []
-        currently_explored_list = []
-        for index in range(0, self.v_count):
-            explored_list.append(False)
-            currently_explored_list.append(False)
-
-        for index in range(0, self.v_count):
-            # returns true if graph has a cycle
-            if explored_list[index] == False:
-                if self.has_cycle_rec(index, explored_list, currently_explored_list) == True:
-                    return True
-
-        return False
-
-    def has_cycle_rec(self, current, explored_list, currently_explored_list):
-        """Recursive helper for has_cycle() method. Takes
-        a current vertice, a list of explored vertices, and
-        a list of vertices currently being explored. This
-        is using a recursive, depth-first search approach."""
-        # current node marked as explored
-        explored_list[current] = True
-        # current node marked as currently being explored
-        currently_explored_list[current] = True
-        neighbor_list = []
-
-        # identify descendants
-        for index in range(0, len(self.adj_matrix[current])):
-            if self.adj_matrix[current][index] > 0:
-                neighbor_list.append(index)
-
-        # if descendant has been visited and also is being explored, then
-        # there is a cycle
-        for neighbor in neighbor_list:
-            if explored_list[neighbor] == False:
-                if self.has_cycle_rec(neighbor, explored_list, currently_explored_list) == True:
-                    return True
-
-            elif currently_explored_list[neighbor] == True:
-                return True
-        # mark as not currently being explored
-        currently_explored_list[current] = False
-        return False
+        return self.find_cycle() is not None
+
+    def find_cycle(self):
+        """
+        Returns a list of vertices forming a cycle in the
+        graph, starting and ending with the same vertex
+        (e.g. [1, 4, 3, 1]), or None if the graph is acyclic.
+        Uses an iterative depth-first search, so deep graphs
+        do not hit the recursion limit.
+        """
+        return find_directed_cycle(range(self.v_count), self._backend.successors)
+
+    def strongly_connected_components(self) -> list:
+        """
+        Returns the strongly connected components of the graph
+        as lists of vertices, in reverse topological order
+        (no edge leads from a component to a later one)
+        """
+        component, count = strongly_connected_components(
+            self.v_count, self._backend.successors)
+        removed = self._removed
+        groups = [[] for _ in range(count)]
+        for v, c in enumerate(component):
+            if v not in removed:
+                groups[c].append(v)
+        # each removed vertex is a component of its own
+        return [group for group in groups if group]
+
+    def build_reachability_index(self) -> ReachabilityIndex:
+        """
+        Builds a reachability index for the current graph (see
+        reachability.py), used by can_reach() until the graph
+        changes, and returns it
+        """
+        self.reachability = ReachabilityIndex(self)
+        return self.reachability
+
+    def can_reach(self, u: int, v: int) -> bool:
+        """
+        Returns True if there is a path from u to v (every
+        vertex reaches itself), False otherwise or if either
+        vertex is not in the graph. Answers in O(1) from the
+        reachability index if one was built; raises
+        StaleIndexError if the graph has changed since, and
+        searches the graph if there is no index.
+        """
+        if self.reachability is not None:
+            return self.reachability.can_reach(u, v)
+
+        if not self._has_vertex(u) or not self._has_vertex(v):
+            return False
+        return v in self.iter_dfs(u)
 
     def dijkstra(self, src: int) -> list:
         """
@@ -306,45 +503,337 @@ class DirectedGraph:
         the path to index 1, etc. If a value is not reachable from
         the source, the returned value is 'inf'.
         """
-        # fill a dictionary with keys representing each
-        # vertex in graph (0...graph_length - 1), and values
-        # representing calculated distances from the source
-        # (initialized to float('inf'))
-        visited_dict = {vertex: float('inf')
-                        for vertex in range(0, self.v_count)}
-        # enter the src node into the visited dictionary with
-        # distance 0
-        visited_dict[src] = 0
-        # push the source node into the priority queue
-        heap = [(0, src)]
-
-        while len(heap) > 0:
-            # pop the lowest valued distance from the priority queue
-            current_distance, current_node = heapq.heappop(heap)
-
-            # processing a node - if the current distance is less
-            # than the saved one (in the visited dictionary)
-            if current_distance <= visited_dict[current_node]:
-                # identify the descendant neighbors and their distances
-                # from the current node
-                for index in range(0, self.v_count):
-                    neighbor_distance = self.adj_matrix[current_node][index]
-                    if neighbor_distance > 0:
-                        neighbor = index
-                        # identify what the new distance to the descendant
-                        # neighbor would be
-                        new_distance = current_distance + neighbor_distance
-                        # if the new distance is less than the one on record
-                        # for the descendant neighbor, enter the new lower
-                        # distance in the visited dict for the neighbor,
-                        # then push it into the priority queue
-                        if new_distance < visited_dict[neighbor]:
-                            visited_dict[neighbor] = new_distance
-                            heapq.heappush(heap, (new_distance, neighbor))
-
-        distances_list = list(visited_dict.values())
-
-        return distances_list
+        if self.instrumentation is not None:
+            return self.instrumentation.measure(
+                'dijkstra', lambda stats: self._dijkstra(src, stats))
+
+        return self._dijkstra(src)
+
+    def _dijkstra(self, src: int, stats=None) -> list:
+        """
+        dijkstra(), adding search counters to stats if given
+        """
+        if self.path_tracker is not None and src in self.path_tracker:
+            distances = self.path_tracker.distances(src)
+        elif src in self._removed:
+            return [float('inf')] * self.v_count
+        else:
+            distances, _ = self._single_source(src, stats)
+        # copy, so callers cannot modify a cached or tracked result
+        return list(distances)
+
+    def shortest_path(self, src: int, dst: int) -> tuple:
+        """
+        Takes a source and a destination vertex and returns a
+        tuple (distance, path) for the shortest path between
+        them, where path is the list of vertices from src to
+        dst. The search stops as soon as dst is settled (unless
+        the path cache is enabled, in which case the full result
+        for src is computed once and cached). If dst is not
+        reachable (or either vertex is not in the graph),
+        returns (inf, []).
+        """
+        if self.instrumentation is not None:
+            return self.instrumentation.measure(
+                'shortest_path', lambda stats: self._shortest_path(src, dst, stats))
+
+        return self._shortest_path(src, dst)
+
+    def _shortest_path(self, src: int, dst: int, stats=None) -> tuple:
+        """
+        shortest_path(), adding search counters to stats if
+        given
+        """
+        if not self._has_vertex(src) or not self._has_vertex(dst):
+            return float('inf'), []
+
+        if self.path_tracker is not None and src in self.path_tracker:
+            distance = self.path_tracker.distances(src)[dst]
+            if distance == float('inf'):
+                return float('inf'), []
+            return distance, self.path_tracker.path(src, dst)
+
+        if self.path_cache is not None:
+            distances, predecessors = self._single_source(src, stats)
+            if distances[dst] == float('inf'):
+                return float('inf'), []
+            return distances[dst], reconstruct_path(predecessors, dst)
+
+        distances, predecessors = dijkstra_search(
+            src, self._backend.out_edges, target=dst, stats=stats)
+
+        if dst not in distances:
+            return float('inf'), []
+
+        return distances[dst], reconstruct_path(predecessors, dst)
+
+    def _single_source(self, src: int, stats=None) -> tuple:
+        """
+        Returns (distance list, predecessor dict) for all vertices
+        from src, served from the path cache when it is enabled.
+        Search counters are added to stats if given.
+        """
+        if self.path_cache is not None:
+            result = self.path_cache.get(src, self.version)
+            if result is not None:
+                return result
+
+        distances, predecessors = dijkstra_search(src, self._backend.out_edges,
+                                                  stats=stats)
+
+        # unreached vertices are missing from distances
+        result = ([distances.get(vertex, float('inf'))
+                   for vertex in range(0, self.v_count)], predecessors)
+
+        if self.path_cache is not None:
+            self.path_cache.put(src, self.version, result)
+
+        return result
+
+    def dijkstra_many(self, sources, workers=None, as_array=False):
+        """
+        Takes an iterable of source vertices and returns one
+        dijkstra() distance list per source, in the same order.
+        With workers > 1 the searches are spread over a pool of
+        that many processes; the graph is sent to each worker
+        once as a compact CSR snapshot. Rows for sources that
+        are not in the graph are all inf. With as_array=True the
+        result is a (sources x vertices) float64 NumPy array.
+        """
+        if self._removed:
+            # -1 is out of range, so removed sources get rows of inf
+            sources = [-1 if src in self._removed else src for src in sources]
+        rows = multi_source_distances(self.to_csr(), sources, workers)
+
+        if as_array:
+            if np is None:
+                raise ImportError('dijkstra_many(as_array=True) requires NumPy')
+            return np.array(rows, dtype=float).reshape(len(rows), self.v_count)
+
+        return rows
+
+    def all_pairs(self):
+        """
+        Returns the matrix of shortest distances between every
+        pair of vertices as a (V x V) float64 NumPy array, with
+        inf for unreachable pairs. Uses vectorized Floyd-Warshall
+        (O(V^3)), which suits small dense graphs; use
+        dijkstra_many() for large sparse ones. Requires NumPy.
+        """
+        dist = floyd_warshall(self.v_count, self._backend.edges())
+        if self._removed:
+            removed = sorted(self._removed)
+            dist[removed, :] = float('inf')
+            dist[:, removed] = float('inf')
+
+        return dist
+
+    def to_csr(self) -> CSRGraph:
+        """
+        Returns a compact read-only CSR snapshot of the graph
+        (later changes to the graph do not affect it). Removed
+        vertices keep their ids, as rows without edges.
+        """
+        return CSRGraph.from_edges(self.v_count, self._backend.edges())
+
+    def freeze(self):
+        """
+        Returns an immutable, hashable FrozenDirectedGraph
+        snapshot of the graph (later changes to the graph do
+        not affect it)
+        """
+        return FrozenDirectedGraph(self.to_csr(), self._removed)
+
+    def save(self, path) -> None:
+        """
+        Writes the graph to path in the binary snapshot format
+        (see graph_snapshot.py); read it back with
+        graph_snapshot.load(), which memory-maps the arrays
+        """
+        from graph_snapshot import save
+        save(self, path)
+
+        return None
+
+    def enable_path_cache(self, maxsize=128) -> None:
+        """
+        Turns on caching of dijkstra() / shortest_path() results
+        for up to maxsize source vertices (least recently used
+        sources are evicted first). Cached results are dropped
+        whenever the graph is changed through add_vertex(),
+        add_edge() or remove_edge(). Counters are available from
+        path_cache.info().
+        """
+        self.path_cache = ShortestPathCache(maxsize)
+
+        return None
+
+    def disable_path_cache(self) -> None:
+        """
+        Turns off the path cache and discards its contents
+        """
+        self.path_cache = None
+
+        return None
+
+    def enable_instrumentation(self, registry=None) -> Instrumentation:
+        """
+        Turns on per-call statistics for dfs(), bfs(), dijkstra()
+        and shortest_path() (see instrumentation.py) and returns
+        the registry collecting them. Pass an existing registry
+        to share it between graphs.
+        """
+        if registry is None:
+            registry = Instrumentation()
+        self.instrumentation = registry
+
+        return registry
+
+    def disable_instrumentation(self) -> None:
+        """
+        Turns off per-call statistics
+        """
+        self.instrumentation = None
+
+        return None
+
+    def track_sources(self, sources) -> None:
+        """
+        Keeps the shortest paths from each vertex in sources up
+        to date as edges change. Every add_edge() / remove_edge()
+        repairs only the part of each shortest-path tree that
+        the change affects (add_edges_bulk() recomputes them),
+        and dijkstra() / shortest_path() for a tracked source
+        answer without searching. Vertices not in the graph are
+        ignored. Counters are available from path_tracker.info().
+        """
+        if self.path_tracker is None:
+            self.path_tracker = DynamicShortestPaths(
+                self.v_count, self._backend.out_edges, self._backend.in_edges)
+
+        for src in sources:
+            if self._has_vertex(src) and src not in self.path_tracker:
+                self.path_tracker.add_source(src)
+
+        return None
+
+    def untrack_sources(self, sources=None) -> None:
+        """
+        Stops tracking the given sources, or every source if
+        sources is None
+        """
+        if self.path_tracker is None:
+            return None
+
+        if sources is None:
+            self.path_tracker = None
+            return None
+
+        for src in sources:
+            self.path_tracker.remove_source(src)
+
+        return None
+
+    def bidirectional_shortest_path(self, src: int, dst: int) -> tuple:
+        """
+        Same result as shortest_path(), computed by searching
+        forward from src and backward from dst at the same
+        time, which settles far fewer vertices on large graphs.
+        Returns (distance, path), or (inf, []) if there is no
+        path or either vertex is not in the graph.
+        """
+        if not self._has_vertex(src) or not self._has_vertex(dst):
+            return float('inf'), []
+
+        return bidirectional_search(src, dst, self._backend.out_edges,
+                                    self._backend.in_edges)
+
+    def astar_shortest_path(self, src: int, dst: int, heuristic) -> tuple:
+        """
+        Same result as shortest_path(), computed with A* search.
+        heuristic(vertex, dst) must return a lower bound on the
+        distance from vertex to dst. Returns (distance, path),
+        or (inf, []) if there is no path or either vertex is
+        not in the graph.
+        """
+        if not self._has_vertex(src) or not self._has_vertex(dst):
+            return float('inf'), []
+
+        return astar_search(src, dst, self._backend.out_edges, heuristic)
+
+
+class FrozenDirectedGraph(DirectedGraph):
+    """
+    Immutable DirectedGraph over a packed CSR snapshot
+    (see DirectedGraph.freeze() and graph_snapshot.load())
+    - every query method works; methods that change the
+      graph raise TypeError
+    - out_degree / in_degree are arrays indexed by vertex,
+      built on first use like the reverse (in-edge) index
+    - hashable and comparable by content, so it can be used
+      as a dict key or cache key
+    - holds no mutable state besides an optional path cache
+      and those lazily built indexes (the reverse index is
+      built under a lock), so it can be shared by threads
+      without locking and pickles as a few flat arrays
+    """
+
+    def __init__(self, csr: CSRGraph, removed=()):
+        """
+        Wraps a CSRGraph, which must not be changed afterwards.
+        removed lists the ids of removed vertices, which must
+        have no edges.
+        """
+        super().__init__(backend=csr)
+        self._removed = frozenset(removed)
+        # degree arrays and the reverse index are built on first
+        # use, so loading a memory-mapped snapshot stays O(1)
+        self._out_degree = None
+        self._in_degree = None
+        self._hash = None
+
+    @property
+    def out_degree(self):
+        """
+        Out-degree of every vertex (an array, built on first
+        use)
+        """
+        if self._out_degree is None:
+            self._out_degree = self._backend.out_degrees()
+        return self._out_degree
+
+    @property
+    def in_degree(self):
+        """
+        In-degree of every vertex (an array, built on first
+        use)
+        """
+        if self._in_degree is None:
+            self._in_degree = self._backend.in_degrees()
+        return self._in_degree
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash((self._backend.content_key(), self._removed))
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenDirectedGraph):
+            return (self._backend.content_key() == other._backend.content_key()
+                    and self._removed == other._removed)
+        return NotImplemented
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('frozen graph is read-only')
+
+    add_vertex = add_edge = add_edges_bulk = remove_edge = _read_only
+    remove_vertex = compact = _read_only
+
+    def freeze(self):
+        """
+        Returns the graph itself, which is already frozen
+        """
+        return self
 
 
 if __name__ == '__main__':
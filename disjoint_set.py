@@ -0,0 +1,82 @@
+# Author: Joel Swenddal
+# Description: Disjoint set (union-find) with path compression
+#              and union by rank
+
+
+class DisjointSet:
+    """
+    Class to implement a disjoint set forest
+    - elements can be any hashable values
+    - find() compresses paths, union() merges by rank,
+      so operations take near-constant amortized time
+    """
+
+    def __init__(self, elements=()):
+        """
+        Start with each element in its own set
+        """
+        self.parent = {}
+        self.rank = {}
+        self.count = 0
+
+        for element in elements:
+            self.add(element)
+
+    def add(self, x) -> None:
+        """
+        Adds x as a new singleton set (no-op if present)
+        """
+        if x not in self.parent:
+            self.parent[x] = x
+            self.rank[x] = 0
+            self.count += 1
+
+        return None
+
+    def find(self, x):
+        """
+        Returns the representative of the set containing x
+        """
+        parent = self.parent
+
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+
+        # path compression: point every node on the path at the root
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+
+        return root
+
+    def union(self, x, y) -> bool:
+        """
+        Merges the sets containing x and y. Returns False if
+        they were already in the same set, True otherwise.
+        """
+        root_x = self.find(x)
+        root_y = self.find(y)
+
+        if root_x == root_y:
+            return False
+
+        # attach the shallower tree under the deeper one
+        if self.rank[root_x] < self.rank[root_y]:
+            root_x, root_y = root_y, root_x
+        self.parent[root_y] = root_x
+        if self.rank[root_x] == self.rank[root_y]:
+            self.rank[root_x] += 1
+
+        self.count -= 1
+        return True
+
+    def groups(self) -> list:
+        """
+        Returns the sets as a list of Python sets, ordered by
+        the first-added member of each set
+        """
+        members = {}
+        for x in self.parent:
+            members.setdefault(self.find(x), set()).add(x)
+
+        return list(members.values())
@@ -0,0 +1,250 @@
+# Author: Joel Swenddal
+# Description: Incrementally maintained single-source shortest paths
+#
+# DynamicShortestPaths keeps the shortest-path tree of a set of
+# source vertices up to date as edges change, repairing only the part
+# of each tree the change affects instead of rerunning Dijkstra:
+#
+# - edge inserted or made cheaper (u -> v): if it shortens the path
+#   to v, a Dijkstra search seeded at v alone propagates the new
+#   distances, and stops where they no longer improve
+# - edge deleted or made more expensive: if it is not the tree edge
+#   into v nothing changes; otherwise only the subtree below v is
+#   affected. Its distances are cleared, each affected vertex is
+#   seeded with its best in-edge from an unaffected vertex, and a
+#   Dijkstra search over the affected vertices finishes the repair
+#
+# DirectedGraph.track_sources() creates one and keeps it informed.
+
+import heapq
+
+from shortest_paths import dijkstra_search
+
+INF = float('inf')
+
+
+class DynamicShortestPaths:
+    """
+    Class to implement shortest-path trees for a set of
+    source vertices that are repaired on every edge change
+    - out_edges(v) / in_edges(v) must return (neighbor,
+      weight) pairs of the current graph
+    - edge_changed() must be called after every change to an
+      edge weight, vertex_added() after every new vertex and
+      renumber() after the graph is compacted
+    - updates / relabeled count repairs and the vertices
+      whose distance they changed, for measuring the savings
+    """
+
+    def __init__(self, v_count, out_edges, in_edges):
+        self.v_count = v_count
+        self._out_edges = out_edges
+        self._in_edges = in_edges
+        # source -> (distance list, parent list); parent is None
+        # for the source and for unreached vertices
+        self.trees = {}
+        self.updates = 0
+        self.relabeled = 0
+
+    def __contains__(self, src):
+        return src in self.trees
+
+    def sources(self) -> list:
+        """
+        Returns the tracked source vertices
+        """
+        return list(self.trees)
+
+    def add_source(self, src: int) -> None:
+        """
+        Starts tracking src (one full Dijkstra search)
+        """
+        distances, predecessors = dijkstra_search(src, self._out_edges)
+        dist = [INF] * self.v_count
+        parent = [None] * self.v_count
+        for vertex, distance in distances.items():
+            dist[vertex] = distance
+            parent[vertex] = predecessors[vertex]
+        self.trees[src] = (dist, parent)
+
+        return None
+
+    def remove_source(self, src: int) -> None:
+        """
+        Stops tracking src (no-op if it is not tracked)
+        """
+        self.trees.pop(src, None)
+
+        return None
+
+    def rebuild(self) -> None:
+        """
+        Recomputes every tree from scratch, e.g. after a bulk
+        load changed many edges at once
+        """
+        for src in list(self.trees):
+            self.add_source(src)
+
+        return None
+
+    def distances(self, src: int) -> list:
+        """
+        Returns the current distance list of a tracked source
+        (the live list; callers must not modify it)
+        """
+        return self.trees[src][0]
+
+    def predecessors(self, src: int) -> dict:
+        """
+        Returns the predecessor dictionary of a tracked source,
+        in the format of dijkstra_search()
+        """
+        dist, parent = self.trees[src]
+        return {vertex: parent[vertex]
+                for vertex in range(self.v_count) if dist[vertex] < INF}
+
+    def path(self, src: int, dst: int) -> list:
+        """
+        Returns the shortest path from a tracked source to dst,
+        or an empty list if dst is not reachable
+        """
+        dist, parent = self.trees[src]
+        if dist[dst] == INF:
+            return []
+
+        path = []
+        vertex = dst
+        while vertex is not None:
+            path.append(vertex)
+            vertex = parent[vertex]
+        path.reverse()
+
+        return path
+
+    def vertex_added(self) -> None:
+        """
+        Extends every tree with a new, unreached vertex
+        """
+        self.v_count += 1
+        for dist, parent in self.trees.values():
+            dist.append(INF)
+            parent.append(None)
+
+        return None
+
+    def renumber(self, id_map) -> None:
+        """
+        Renumbers every tree after the graph was compacted.
+        id_map maps each remaining old id to its new id, in
+        ascending order; dropped vertices must be unreached.
+        """
+        live = list(id_map)
+        trees = {}
+        for src, (dist, parent) in self.trees.items():
+            trees[id_map[src]] = (
+                [dist[v] for v in live],
+                [None if parent[v] is None else id_map[parent[v]] for v in live])
+        self.trees = trees
+        self.v_count = len(live)
+
+        return None
+
+    def edge_changed(self, u: int, v: int, old_weight, new_weight) -> None:
+        """
+        Repairs every tree after the weight of edge u -> v
+        changed from old_weight to new_weight (0 meaning no
+        edge). The graph must already hold the new weight.
+        """
+        if new_weight == old_weight:
+            return None
+
+        self.updates += 1
+        for dist, parent in self.trees.values():
+            if new_weight and (not old_weight or new_weight < old_weight):
+                self._decrease(dist, parent, u, v, new_weight)
+            elif parent[v] == u:
+                self._increase(dist, parent, v)
+
+        return None
+
+    def _propagate(self, dist, parent, heap) -> None:
+        """
+        Dijkstra relaxation from the (distance, vertex) entries
+        in heap, lowering distances that improve
+        """
+        out_edges = self._out_edges
+
+        while heap:
+            distance, vertex = heapq.heappop(heap)
+
+            # skip stale heap entries
+            if distance > dist[vertex]:
+                continue
+            self.relabeled += 1
+
+            for neighbor, weight in out_edges(vertex):
+                new_distance = distance + weight
+                if new_distance < dist[neighbor]:
+                    dist[neighbor] = new_distance
+                    parent[neighbor] = vertex
+                    heapq.heappush(heap, (new_distance, neighbor))
+
+        return None
+
+    def _decrease(self, dist, parent, u, v, weight) -> None:
+        """
+        Repair after u -> v was inserted or made cheaper
+        """
+        new_distance = dist[u] + weight
+        if new_distance >= dist[v]:
+            return None
+
+        dist[v] = new_distance
+        parent[v] = u
+        self._propagate(dist, parent, [(new_distance, v)])
+
+        return None
+
+    def _increase(self, dist, parent, v) -> None:
+        """
+        Repair after the tree edge into v was deleted or made
+        more expensive
+        """
+        out_edges = self._out_edges
+
+        # the subtree rooted at v: the vertices whose path used the edge
+        affected = {v}
+        stack = [v]
+        while stack:
+            vertex = stack.pop()
+            for neighbor, _ in out_edges(vertex):
+                if parent[neighbor] == vertex and neighbor not in affected:
+                    affected.add(neighbor)
+                    stack.append(neighbor)
+
+        for vertex in affected:
+            dist[vertex] = INF
+            parent[vertex] = None
+
+        # best way into each affected vertex from the rest of the tree
+        heap = []
+        for vertex in affected:
+            for neighbor, weight in self._in_edges(vertex):
+                if neighbor not in affected and dist[neighbor] + weight < dist[vertex]:
+                    dist[vertex] = dist[neighbor] + weight
+                    parent[vertex] = neighbor
+            if dist[vertex] < INF:
+                heap.append((dist[vertex], vertex))
+        heapq.heapify(heap)
+
+        self._propagate(dist, parent, heap)
+
+        return None
+
+    def info(self) -> dict:
+        """
+        Returns the counters and number of tracked sources
+        as a dictionary
+        """
+        return {'sources': len(self.trees), 'updates': self.updates,
+                'relabeled': self.relabeled}
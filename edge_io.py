@@ -0,0 +1,138 @@
+# Author: Joel Swenddal
+# Description: Streaming readers and writers for edge-list files
+#
+# An edge-list file has one edge per line, "u v [w]", with fields
+# separated by whitespace (default), commas (CSV) or tabs (TSV).
+# Blank lines and lines starting with '#' are skipped. Files whose
+# name ends in .gz are (de)compressed with gzip transparently.
+#
+# Readers parse the file one chunk of lines at a time, so memory use
+# is bounded by the chunk size and not the file size. Their output
+# can be passed straight to the bulk loaders:
+#
+#   g = DirectedGraph.from_edges(read_directed_edges('roads.tsv.gz'),
+#                                backend='sparse')
+#   write_edges('roads.csv', g.iter_edges(), delimiter=',')
+
+import gzip
+
+DEFAULT_CHUNK_SIZE = 1 << 20    # bytes of text per chunk
+
+
+def _open(path, mode):
+    """
+    Opens path as text, through gzip if it ends in .gz.
+    File objects are returned unchanged.
+    """
+    if not isinstance(path, (str, bytes)) and not hasattr(path, '__fspath__'):
+        return path
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def _number(text):
+    """
+    Parses an edge weight as an int if possible, else a float
+    """
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def iter_line_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, skip_header=False):
+    """
+    Generator yielding the raw lines of path (or an open
+    text file) in lists of about chunk_size bytes of text.
+    Lines are not parsed or filtered: comment and blank
+    lines are included, and only the first line is dropped
+    if skip_header is True (see _split_lines())
+    """
+    file = _open(path, 'r')
+    try:
+        first = True
+        while True:
+            lines = file.readlines(chunk_size)
+            if not lines:
+                return
+            if first and skip_header:
+                lines = lines[1:]
+            first = False
+            yield lines
+    finally:
+        if file is not path:
+            file.close()
+
+
+def _split_lines(lines, delimiter):
+    """
+    Yields the fields of every data line, stripping
+    whitespace and skipping blank and comment lines
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] == '#':
+            continue
+        if delimiter is None:
+            yield line.split()
+        else:
+            yield [field.strip() for field in line.split(delimiter)]
+
+
+def read_directed_edges(path, delimiter=None, default_weight=1,
+                        chunk_size=DEFAULT_CHUNK_SIZE, skip_header=False):
+    """
+    Generator yielding (src, dst, weight) tuples with integer
+    vertex ids from an edge-list file. Lines without a weight
+    get default_weight. delimiter is None for any whitespace,
+    or a single character such as ',' or '\\t'.
+    """
+    for lines in iter_line_chunks(path, chunk_size, skip_header):
+        edges = []
+        for fields in _split_lines(lines, delimiter):
+            weight = _number(fields[2]) if len(fields) > 2 else default_weight
+            edges.append((int(fields[0]), int(fields[1]), weight))
+        yield from edges
+
+
+def read_undirected_edges(path, delimiter=None,
+                          chunk_size=DEFAULT_CHUNK_SIZE, skip_header=False):
+    """
+    Generator yielding (u, v) string pairs from an edge-list
+    file (any extra columns are ignored). delimiter is as for
+    read_directed_edges().
+    """
+    for lines in iter_line_chunks(path, chunk_size, skip_header):
+        edges = [(fields[0], fields[1])
+                 for fields in _split_lines(lines, delimiter)]
+        yield from edges
+
+
+def write_edges(path, edges, delimiter=' ', chunk_size=DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Writes edge tuples from any iterable (for example
+    iter_edges() of either graph) to path or an open text
+    file, one per line, buffering about chunk_size bytes of
+    text between writes. Returns the number of edges written.
+    """
+    file = _open(path, 'w')
+    count = 0
+    try:
+        buffer = []
+        buffered = 0
+        for edge in edges:
+            line = delimiter.join(map(str, edge)) + '\n'
+            buffer.append(line)
+            buffered += len(line)
+            count += 1
+            if buffered >= chunk_size:
+                file.write(''.join(buffer))
+                buffer = []
+                buffered = 0
+        file.write(''.join(buffer))
+    finally:
+        if file is not path:
+            file.close()
+
+    return count
@@ -0,0 +1,478 @@
+# Author: Joel Swenddal
+# Description: Storage backends for the DirectedGraph class
+
+try:
+    import numpy as np
+except ImportError:     # numpy is only needed by NumpyMatrixBackend
+    np = None
+
+
+class DenseMatrixBackend:
+    """
+    Stores edge weights in a dense adjacency matrix
+    (list of lists). Memory is O(V^2) and finding the
+    neighbors of a vertex scans a full row, but looking
+    up a single edge is O(1).
+    """
+    name = 'dense'
+
+    def __init__(self):
+        self.v_count = 0
+        self.adj_matrix = []
+
+    @property
+    def matrix(self):
+        """
+        Returns the live adjacency matrix
+        """
+        return self.adj_matrix
+
+    def add_vertex(self) -> int:
+        """
+        Adds a new vertex (one row and one column)
+        and returns the updated number of vertices
+        """
+        for row in self.adj_matrix:
+            row.append(0)
+        self.v_count += 1
+        self.adj_matrix.append([0] * self.v_count)
+
+        return self.v_count
+
+    def ensure_vertices(self, count: int) -> None:
+        """
+        Grows the matrix to at least count vertices,
+        padding every existing row once
+        """
+        extra = count - self.v_count
+        if extra <= 0:
+            return None
+
+        padding = [0] * extra
+        for row in self.adj_matrix:
+            row.extend(padding)
+        self.adj_matrix.extend([0] * count for _ in range(extra))
+        self.v_count = count
+
+        return None
+
+    def compact(self, live: list) -> None:
+        """
+        Keeps only the vertices in live (ascending ids),
+        renumbered 0 .. len(live) - 1 in the same order
+        """
+        matrix = self.adj_matrix
+        self.adj_matrix = [[matrix[src][dst] for dst in live] for src in live]
+        self.v_count = len(live)
+
+        return None
+
+    def get_weight(self, src: int, dst: int):
+        """
+        Returns the weight of edge src -> dst,
+        or 0 if there is no such edge
+        """
+        return self.adj_matrix[src][dst]
+
+    def set_weight(self, src: int, dst: int, weight) -> None:
+        """
+        Sets the weight of edge src -> dst. A weight
+        of 0 removes the edge.
+        """
+        self.adj_matrix[src][dst] = weight
+
+    def successors(self, v: int) -> list:
+        """
+        Returns the out-neighbors of v in ascending order
+        """
+        return [index for index, weight in enumerate(self.adj_matrix[v])
+                if weight > 0]
+
+    def out_edges(self, v: int) -> list:
+        """
+        Returns (neighbor, weight) pairs for the out-edges
+        of v in ascending neighbor order
+        """
+        return [(index, weight) for index, weight in enumerate(self.adj_matrix[v])
+                if weight > 0]
+
+    def in_edges(self, v: int) -> list:
+        """
+        Returns (neighbor, weight) pairs for the in-edges
+        of v in ascending neighbor order (a column scan)
+        """
+        return [(index, row[v]) for index, row in enumerate(self.adj_matrix)
+                if row[v] > 0]
+
+    def edges(self):
+        """
+        Yields (src, dst, weight) for every edge in
+        row-major order
+        """
+        for src, row in enumerate(self.adj_matrix):
+            for dst, weight in enumerate(row):
+                if weight > 0:
+                    yield (src, dst, weight)
+
+    def row(self, v: int) -> list:
+        """
+        Returns row v of the adjacency matrix
+        """
+        return self.adj_matrix[v]
+
+
+class SparseBackend:
+    """
+    Stores the out-edges of each vertex in a dictionary
+    that maps neighbor -> weight. Memory is O(V + E) and
+    the cost of visiting the neighbors of a vertex is
+    proportional to its out-degree.
+    """
+    name = 'sparse'
+
+    def __init__(self):
+        self.v_count = 0
+        self.rows = []
+        # reverse index: in_rows[dst] maps src -> weight
+        self.in_rows = []
+
+    @property
+    def matrix(self):
+        """
+        Returns a read-only, row-by-row dense view of the
+        adjacency matrix (rows are built on demand)
+        """
+        return _DenseView(self)
+
+    def add_vertex(self) -> int:
+        """
+        Adds a new vertex and returns the updated
+        number of vertices
+        """
+        self.rows.append({})
+        self.in_rows.append({})
+        self.v_count += 1
+
+        return self.v_count
+
+    def ensure_vertices(self, count: int) -> None:
+        """
+        Adds vertices until there are at least count
+        """
+        extra = count - self.v_count
+        if extra <= 0:
+            return None
+
+        self.rows.extend({} for _ in range(extra))
+        self.in_rows.extend({} for _ in range(extra))
+        self.v_count = count
+
+        return None
+
+    def compact(self, live: list) -> None:
+        """
+        Keeps only the vertices in live (ascending ids),
+        renumbered 0 .. len(live) - 1 in the same order.
+        Removed vertices must have no edges left.
+        """
+        new_id = {old: new for new, old in enumerate(live)}
+        self.rows = [{new_id[dst]: weight for dst, weight in self.rows[src].items()}
+                     for src in live]
+        self.in_rows = [{new_id[src]: weight for src, weight in self.in_rows[dst].items()}
+                        for dst in live]
+        self.v_count = len(live)
+
+        return None
+
+    def get_weight(self, src: int, dst: int):
+        """
+        Returns the weight of edge src -> dst,
+        or 0 if there is no such edge
+        """
+        return self.rows[src].get(dst, 0)
+
+    def set_weight(self, src: int, dst: int, weight) -> None:
+        """
+        Sets the weight of edge src -> dst. A weight
+        of 0 removes the edge.
+        """
+        if src < 0:
+            src += self.v_count
+        if dst < 0:
+            dst += self.v_count
+
+        if weight:
+            self.rows[src][dst] = weight
+            self.in_rows[dst][src] = weight
+        else:
+            self.rows[src].pop(dst, None)
+            self.in_rows[dst].pop(src, None)
+
+    def successors(self, v: int) -> list:
+        """
+        Returns the out-neighbors of v in ascending order
+        """
+        return sorted(self.rows[v])
+
+    def out_edges(self, v: int) -> list:
+        """
+        Returns (neighbor, weight) pairs for the out-edges
+        of v in ascending neighbor order
+        """
+        return sorted(self.rows[v].items())
+
+    def in_edges(self, v: int) -> list:
+        """
+        Returns (neighbor, weight) pairs for the in-edges
+        of v in ascending neighbor order
+        """
+        return sorted(self.in_rows[v].items())
+
+    def edges(self):
+        """
+        Yields (src, dst, weight) for every edge in
+        row-major order
+        """
+        for src in range(self.v_count):
+            for dst, weight in self.out_edges(src):
+                yield (src, dst, weight)
+
+    def row(self, v: int) -> list:
+        """
+        Returns row v of the adjacency matrix as a dense list
+        """
+        dense_row = [0] * self.v_count
+        for dst, weight in self.rows[v].items():
+            dense_row[dst] = weight
+        return dense_row
+
+
+class NumpyMatrixBackend:
+    """
+    Stores edge weights in a preallocated NumPy matrix
+    that grows geometrically, so adding a vertex is
+    amortized O(V) with no per-row Python work. Neighbor
+    discovery and edge listing use vectorized nonzero().
+    Weights are stored as int32 by default; pass
+    dtype='float32' (or any NumPy dtype) for
+    fractional weights. A weight the dtype cannot hold
+    exactly widens the matrix to int64 or float64 (or
+    raises ValueError if neither can), so stored weights
+    always equal the weights given.
+    """
+    name = 'numpy'
+
+    def __init__(self, dtype='int32', capacity=16):
+        if np is None:
+            raise ImportError("the 'numpy' graph backend requires NumPy")
+        self.v_count = 0
+        self.weights = np.zeros((capacity, capacity), dtype=dtype)
+        self._set_bounds()
+
+    def _set_bounds(self) -> None:
+        """
+        Caches the range of integers the dtype holds exactly
+        (None for other dtypes)
+        """
+        dtype = self.weights.dtype
+        if dtype.kind in 'iu':
+            info = np.iinfo(dtype)
+            self._bounds = (int(info.min), int(info.max))
+        else:
+            self._bounds = None
+
+        return None
+
+    def _fits(self, weight) -> bool:
+        """
+        Returns True if weight can be stored without changing
+        its value
+        """
+        if self._bounds is not None:
+            low, high = self._bounds
+            return isinstance(weight, (int, np.integer)) and low <= weight <= high
+        try:
+            return self.weights.dtype.type(weight).item() == weight
+        except (OverflowError, TypeError, ValueError):
+            return False
+
+    def _widen(self, weight) -> None:
+        """
+        Converts the matrix to a dtype that holds weight and
+        every stored weight exactly
+        """
+        if isinstance(weight, (int, np.integer)) and self.weights.dtype.kind in 'iu':
+            dtype = np.dtype('int64')
+        else:
+            dtype = np.dtype('float64')
+            # int64 weights above 2^53 have no exact float64 value
+            if self.weights.dtype.kind in 'iu' and self.v_count and \
+                    np.abs(self.matrix).max() > 2 ** 53:
+                raise ValueError(f'weight {weight!r} cannot be stored with the '
+                                 f'existing {self.weights.dtype} weights')
+
+        try:
+            fits = dtype.type(weight).item() == weight
+        except (OverflowError, TypeError, ValueError):
+            fits = False
+        if not fits:
+            raise ValueError(f'weight {weight!r} cannot be stored in a NumPy matrix')
+
+        self.weights = self.weights.astype(dtype)
+        self._set_bounds()
+
+        return None
+
+    @property
+    def matrix(self):
+        """
+        Returns a live (v_count x v_count) view of the matrix
+        """
+        n = self.v_count
+        return self.weights[:n, :n]
+
+    def add_vertex(self) -> int:
+        """
+        Adds a new vertex and returns the updated number
+        of vertices. Doubles the matrix capacity when full.
+        """
+        self.ensure_vertices(self.v_count + 1)
+
+        return self.v_count
+
+    def ensure_vertices(self, count: int) -> None:
+        """
+        Grows the graph to at least count vertices. When the
+        matrix is full its capacity is at least doubled.
+        """
+        if count <= self.v_count:
+            return None
+
+        capacity = self.weights.shape[0]
+        if count > capacity:
+            new_capacity = max(count, capacity * 2)
+            grown = np.zeros((new_capacity, new_capacity),
+                             dtype=self.weights.dtype)
+            grown[:capacity, :capacity] = self.weights
+            self.weights = grown
+        self.v_count = count
+
+        return None
+
+    def compact(self, live: list) -> None:
+        """
+        Keeps only the vertices in live (ascending ids),
+        renumbered 0 .. len(live) - 1 in the same order
+        """
+        n, old_count = len(live), self.v_count
+        index = np.asarray(live, dtype=np.intp)
+        self.weights[:n, :n] = self.weights[np.ix_(index, index)]
+        # vertices added later expect zeroed rows and columns
+        self.weights[n:old_count, :old_count] = 0
+        self.weights[:old_count, n:old_count] = 0
+        self.v_count = n
+
+        return None
+
+    def get_weight(self, src: int, dst: int):
+        """
+        Returns the weight of edge src -> dst,
+        or 0 if there is no such edge
+        """
+        return self.matrix[src, dst].item()
+
+    def set_weight(self, src: int, dst: int, weight) -> None:
+        """
+        Sets the weight of edge src -> dst. A weight
+        of 0 removes the edge.
+        """
+        if not self._fits(weight):
+            self._widen(weight)
+        self.matrix[src, dst] = weight
+
+    def successors(self, v: int) -> list:
+        """
+        Returns the out-neighbors of v in ascending order
+        """
+        return np.flatnonzero(self.weights[v, :self.v_count]).tolist()
+
+    def out_edges(self, v: int) -> list:
+        """
+        Returns (neighbor, weight) pairs for the out-edges
+        of v in ascending neighbor order
+        """
+        row = self.weights[v, :self.v_count]
+        index = np.flatnonzero(row)
+        return list(zip(index.tolist(), row[index].tolist()))
+
+    def in_edges(self, v: int) -> list:
+        """
+        Returns (neighbor, weight) pairs for the in-edges
+        of v in ascending neighbor order
+        """
+        column = self.weights[:self.v_count, v]
+        index = np.flatnonzero(column)
+        return list(zip(index.tolist(), column[index].tolist()))
+
+    def edges(self):
+        """
+        Returns an iterator of (src, dst, weight) for every
+        edge in row-major order, found in one vectorized pass
+        """
+        matrix = self.matrix
+        src, dst = np.nonzero(matrix)
+        return zip(src.tolist(), dst.tolist(), matrix[src, dst].tolist())
+
+    def row(self, v: int) -> list:
+        """
+        Returns row v of the adjacency matrix as a list
+        """
+        return self.weights[v, :self.v_count].tolist()
+
+
+class _DenseView:
+    """
+    Read-only stand-in for adj_matrix on backends that
+    do not keep a dense matrix. Supports indexing, len()
+    and iteration over rows; rows are built on demand as
+    tuples, so writing to one raises instead of being lost.
+    """
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def __len__(self):
+        return self._backend.v_count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._backend.v_count
+        if index < 0 or index >= self._backend.v_count:
+            raise IndexError('adjacency matrix row out of range')
+        return tuple(self._backend.row(index))
+
+    def __iter__(self):
+        for index in range(self._backend.v_count):
+            yield tuple(self._backend.row(index))
+
+
+BACKENDS = {
+    DenseMatrixBackend.name: DenseMatrixBackend,
+    SparseBackend.name: SparseBackend,
+    NumpyMatrixBackend.name: NumpyMatrixBackend,
+}
+
+
+def make_backend(name):
+    """
+    Returns a new, empty storage backend given its
+    name ('dense', 'sparse' or 'numpy'). An already
+    constructed backend instance is returned as is, which
+    allows options such as NumpyMatrixBackend(dtype=...).
+    """
+    if not isinstance(name, str):
+        return name
+    if name not in BACKENDS:
+        raise ValueError(f'unknown graph backend: {name!r} '
+                         f'(expected one of {sorted(BACKENDS)})')
+    return BACKENDS[name]()
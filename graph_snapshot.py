@@ -0,0 +1,165 @@
+# Author: Joel Swenddal
+# Description: Versioned binary snapshot format for DirectedGraph
+#              and UndirectedGraph, with memory-mapped loading
+#
+# File layout (little-endian, every section 8-byte aligned):
+#   header        magic, format version, graph kind, weight typecode,
+#                 v_count, e_count, size of the name bytes (undirected)
+#                 or number of removed vertex ids (directed)
+#   name offsets  int64 x (v_count + 1)       undirected graphs only
+#   name bytes    UTF-8 names, concatenated    undirected graphs only
+#   offsets       int64 x (v_count + 1)       CSR row offsets
+#   targets       int32 x e_count              CSR column ids
+#   weights       int64 or float64 x e_count   directed graphs only
+#   removed       int32 x removed count        directed graphs only
+#
+# An undirected graph stores every edge in both directions, with
+# vertex ids numbered in name order, so each row is already in the
+# alphabetical order dfs() / bfs() visit neighbors in.
+#
+# Version 2 added the removed section; version 1 files still load.
+
+import mmap as _mmap
+import struct
+import sys
+from array import array
+
+from csr_graph import CSRGraph
+from d_graph import DirectedGraph, FrozenDirectedGraph
+from ud_graph import FrozenUndirectedGraph, UndirectedGraph
+
+MAGIC = b'GRAPHADT'
+FORMAT_VERSION = 2
+READABLE_VERSIONS = (1, 2)
+DIRECTED, UNDIRECTED = 0, 1
+
+HEADER = struct.Struct('<8sHBB4xqqq')
+
+
+def _pad(size: int) -> int:
+    """
+    Returns the number of bytes needed to pad size to 8
+    """
+    return -size % 8
+
+
+def _write_array(file, values) -> None:
+    """
+    Writes a typed array little-endian, padded to 8 bytes
+    """
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    data = values.tobytes()
+    file.write(data)
+    file.write(b'\0' * _pad(len(data)))
+
+
+def save(graph, path) -> None:
+    """
+    Writes graph (a DirectedGraph or UndirectedGraph) to
+    path in the binary snapshot format. Undirected vertex
+    names must be strings.
+    """
+    if isinstance(graph, DirectedGraph):
+        csr = graph.to_csr()
+        removed = array('i', sorted(graph._removed))
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, DIRECTED,
+                                   ord(csr.weights.typecode),
+                                   csr.v_count, csr.e_count, len(removed)))
+            _write_array(file, csr.offsets)
+            _write_array(file, csr.targets)
+            _write_array(file, csr.weights)
+            _write_array(file, removed)
+        return None
+
+    if isinstance(graph, UndirectedGraph):
+        # vertices renumbered in name order
+        names, offsets, targets = graph._csr_arrays()
+        if not all(isinstance(name, str) for name in names):
+            raise TypeError('only graphs with string vertex names can be saved')
+        encoded = [name.encode('utf-8') for name in names]
+
+        name_offsets = array('q', [0])
+        for data in encoded:
+            name_offsets.append(name_offsets[-1] + len(data))
+
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, UNDIRECTED, 0,
+                                   len(names), len(targets), name_offsets[-1]))
+            _write_array(file, name_offsets)
+            file.write(b''.join(encoded))
+            file.write(b'\0' * _pad(name_offsets[-1]))
+            _write_array(file, offsets)
+            _write_array(file, targets)
+        return None
+
+    raise TypeError(f'cannot save {type(graph).__name__}')
+
+
+def load(path, mmap=True):
+    """
+    Reads a snapshot written by save() and returns a frozen
+    graph: a FrozenDirectedGraph or FrozenUndirectedGraph.
+    All query methods work; methods that change the graph
+    raise TypeError.
+
+    With mmap=True the CSR arrays are memory-mapped views of
+    the file, so processes loading the same snapshot share one
+    copy through the page cache. Undirected vertex names are
+    decoded into memory either way (they back the name -> id
+    lookup).
+    """
+    with open(path, 'rb') as file:
+        # a big-endian machine cannot use the little-endian data in place
+        if mmap and sys.byteorder == 'little':
+            buffer = memoryview(_mmap.mmap(file.fileno(), 0, access=_mmap.ACCESS_READ))
+            copy = False
+        else:
+            buffer = memoryview(file.read())
+            copy = True
+
+    if len(buffer) < HEADER.size:
+        raise ValueError(f'{path}: not a graph snapshot')
+    magic, version, kind, weight_code, v_count, e_count, names_size = \
+        HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError(f'{path}: not a graph snapshot')
+    if version not in READABLE_VERSIONS:
+        raise ValueError(f'{path}: unsupported snapshot version {version}')
+
+    position = HEADER.size
+
+    def section(typecode, count):
+        nonlocal position
+        size = array(typecode).itemsize * count
+        view = buffer[position:position + size]
+        position += size + _pad(size)
+        if not copy:
+            return view.cast(typecode)
+        values = array(typecode, view.tobytes())
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return values
+
+    if kind == DIRECTED:
+        offsets = section('q', v_count + 1)
+        targets = section('i', e_count)
+        weights = section(chr(weight_code), e_count)
+        # the count field is always 0 in version 1 directed files
+        removed = section('i', names_size)
+        return FrozenDirectedGraph(CSRGraph(v_count, offsets, targets, weights), removed)
+
+    if kind == UNDIRECTED:
+        name_offsets = section('q', v_count + 1)
+        name_bytes = bytes(buffer[position:position + names_size])
+        position += names_size + _pad(names_size)
+        offsets = section('q', v_count + 1)
+        targets = section('i', e_count)
+
+        names = [name_bytes[name_offsets[index]:name_offsets[index + 1]].decode('utf-8')
+                 for index in range(v_count)]
+        return FrozenUndirectedGraph(names, offsets, targets)
+
+    raise ValueError(f'{path}: unknown graph kind {kind}')
@@ -0,0 +1,216 @@
+# Author: Joel Swenddal
+# Description: Lazy depth-first and breadth-first traversal engine
+#              shared by DirectedGraph and UndirectedGraph
+
+from collections import deque
+
+from instrumentation import counting_neighbors, sample_frontier
+
+
+def iter_dfs(v_start, neighbors, stop=None, max_depth=None, details=False,
+             stats=None):
+    """
+    Generator for a depth-first search from v_start.
+    neighbors(v) must return the neighbors of v in the
+    order they should be visited (ascending). Yields each
+    vertex when it is visited, or a (vertex, depth, parent)
+    tuple if details is True (parent is None for v_start).
+
+    stop is an optional predicate: the traversal ends right
+    after yielding a vertex for which stop(vertex) is True.
+    Vertices at depth max_depth are yielded but not expanded.
+    Depths are measured along the DFS tree.
+
+    If stats is a dictionary from instrumentation.new_stats(),
+    the search adds its counters to it when it ends.
+    """
+    visited = set()
+
+    # stack entries are (vertex, parent, depth)
+    stack = [(v_start, None, 0)]
+
+    if stats is not None:
+        neighbors = counting_neighbors(neighbors, stats)
+        sample_frontier(stats, stack)
+
+    try:
+        while stack:
+            current, parent, depth = stack.pop()
+
+            # a vertex can sit on the stack more than once; only
+            # the first pop (the most recent push) visits it
+            if current in visited:
+                if stats is not None:
+                    stats['stale'] += 1
+                continue
+            visited.add(current)
+
+            yield (current, depth, parent) if details else current
+
+            if stop is not None and stop(current):
+                return
+
+            if max_depth is not None and depth >= max_depth:
+                continue
+
+            # push in descending order so they pop in ascending order
+            for neighbor in reversed(neighbors(current)):
+                if neighbor not in visited:
+                    stack.append((neighbor, current, depth + 1))
+            if stats is not None:
+                sample_frontier(stats, stack)
+    finally:
+        if stats is not None:
+            sample_frontier(stats, stack)
+            pops = len(visited) + stats['stale']
+            stats['vertices'] += len(visited)
+            stats['pops'] += pops
+            stats['pushes'] += pops + len(stack)
+
+
+def iter_bfs(v_start, neighbors, stop=None, max_depth=None, details=False,
+             stats=None):
+    """
+    Generator for a breadth-first search from v_start.
+    Takes the same arguments and yields the same values
+    as iter_dfs(); depths are shortest hop counts.
+    """
+    # vertices are marked as discovered when they are queued,
+    # so each one enters the queue at most once
+    discovered = {v_start}
+
+    # queue entries are (vertex, parent, depth)
+    queue = deque([(v_start, None, 0)])
+
+    if stats is not None:
+        neighbors = counting_neighbors(neighbors, stats)
+        sample_frontier(stats, queue)
+
+    try:
+        while queue:
+            current, parent, depth = queue.popleft()
+
+            yield (current, depth, parent) if details else current
+
+            if stop is not None and stop(current):
+                return
+
+            if max_depth is not None and depth >= max_depth:
+                continue
+
+            for neighbor in neighbors(current):
+                if neighbor not in discovered:
+                    discovered.add(neighbor)
+                    queue.append((neighbor, current, depth + 1))
+            if stats is not None:
+                sample_frontier(stats, queue)
+    finally:
+        if stats is not None:
+            sample_frontier(stats, queue)
+            # nothing is queued twice, so every pop is a visit
+            visited = len(discovered) - len(queue)
+            stats['vertices'] += visited
+            stats['pops'] += visited
+            stats['pushes'] += len(discovered)
+
+
+def find_directed_cycle(vertices, neighbors):
+    """
+    Iterative three-color depth-first search for a directed
+    cycle. Runs in O(V + E) without recursion. Returns the
+    first cycle found as a list of vertices that starts and
+    ends with the same vertex, or None if there is no cycle.
+    """
+    # missing from `state` = unvisited, ON_PATH = on the current
+    # DFS path (grey), DONE = fully explored (black)
+    ON_PATH, DONE = 1, 2
+    state = {}
+
+    for root in vertices:
+        if root in state:
+            continue
+
+        state[root] = ON_PATH
+        path = [root]
+        # one neighbor iterator per vertex on the current path
+        stack = [iter(neighbors(root))]
+
+        while stack:
+            for neighbor in stack[-1]:
+                neighbor_state = state.get(neighbor)
+
+                # edge back to a vertex on the current path closes a cycle
+                if neighbor_state == ON_PATH:
+                    return path[path.index(neighbor):] + [neighbor]
+
+                if neighbor_state is None:
+                    state[neighbor] = ON_PATH
+                    path.append(neighbor)
+                    stack.append(iter(neighbors(neighbor)))
+                    break
+            else:
+                # all neighbors explored
+                state[path.pop()] = DONE
+                stack.pop()
+
+    return None
+
+
+def strongly_connected_components(v_count, neighbors) -> tuple:
+    """
+    Iterative Tarjan search for the strongly connected
+    components of a graph on vertices 0 .. v_count - 1.
+    Runs in O(V + E) without recursion. Returns (component,
+    count): component[v] is the component number of v, and
+    components are numbered in reverse topological order, so
+    every edge between components goes from a higher number
+    to a lower one.
+    """
+    index = [-1] * v_count      # discovery order, -1 = unvisited
+    low = [0] * v_count         # lowest index reachable in the DFS subtree
+    on_stack = [False] * v_count
+    component = [-1] * v_count
+    stack = []
+    counter = 0
+    count = 0
+
+    for root in range(v_count):
+        if index[root] != -1:
+            continue
+
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        # (vertex, neighbor iterator) for each vertex on the DFS path
+        path = [(root, iter(neighbors(root)))]
+
+        while path:
+            vertex, remaining = path[-1]
+            for neighbor in remaining:
+                if index[neighbor] == -1:
+                    index[neighbor] = low[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack[neighbor] = True
+                    path.append((neighbor, iter(neighbors(neighbor))))
+                    break
+                if on_stack[neighbor] and index[neighbor] < low[vertex]:
+                    low[vertex] = index[neighbor]
+            else:
+                # all neighbors explored
+                path.pop()
+                if path and low[vertex] < low[path[-1][0]]:
+                    low[path[-1][0]] = low[vertex]
+
+                # vertex is the root of a component: pop it off the stack
+                if low[vertex] == index[vertex]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = count
+                        if member == vertex:
+                            break
+                    count += 1
+
+    return component, count
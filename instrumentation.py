@@ -0,0 +1,147 @@
+# Author: Joel Swenddal
+# Description: Opt-in per-call statistics for traversals and
+#              shortest path searches
+#
+# graph.enable_instrumentation() returns an Instrumentation registry.
+# From then on every dfs(), bfs(), dijkstra() and shortest_path()
+# call (and undirected dfs() / bfs()) collects:
+#
+#   vertices        vertices visited (settled, for Dijkstra)
+#   edges           edges scanned while expanding them
+#   pushes / pops   entries added to / removed from the frontier
+#                   (queue, stack or heap)
+#   stale           frontier entries popped for an already visited
+#                   vertex and skipped
+#   frontier_peak   largest frontier, measured at the start, after
+#                   the pushes of every expansion and at the end
+#   seconds         wall time of the call
+#
+# Each call's stats are passed to every registered hook and added to
+# per-method totals (summary()). One registry can be shared by several
+# graphs. With instrumentation off the only costs are one attribute
+# check per call and one None check per expanded vertex.
+
+import threading
+import time
+
+COUNTERS = ('vertices', 'edges', 'pushes', 'pops', 'stale', 'frontier_peak')
+
+
+def new_stats() -> dict:
+    """
+    Returns a zeroed stats dictionary for one call
+    """
+    return dict.fromkeys(COUNTERS, 0)
+
+
+def counting_neighbors(neighbors, stats):
+    """
+    Wraps a neighbor function so each call adds the number
+    of neighbors returned to stats['edges']
+    """
+    def counted(vertex):
+        result = neighbors(vertex)
+        stats['edges'] += len(result)
+        return result
+
+    return counted
+
+
+def sample_frontier(stats, frontier) -> None:
+    """
+    Raises stats['frontier_peak'] to the current size of
+    the frontier container (queue, stack or heap)
+    """
+    if len(frontier) > stats['frontier_peak']:
+        stats['frontier_peak'] = len(frontier)
+
+    return None
+
+
+class Instrumentation:
+    """
+    Class to implement a registry of per-call statistics
+    - add_hook(hook) registers hook(method, stats), called
+      after every instrumented call
+    - summary() returns the totals per method
+    - safe to share between threads
+    """
+
+    def __init__(self):
+        self.hooks = []
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook) -> None:
+        """
+        Registers hook(method, stats) to be called after every
+        instrumented call (stats must not be modified)
+        """
+        self.hooks.append(hook)
+
+        return None
+
+    def remove_hook(self, hook) -> None:
+        """
+        Unregisters a hook (no-op if it is not registered)
+        """
+        if hook in self.hooks:
+            self.hooks.remove(hook)
+
+        return None
+
+    def measure(self, method: str, func):
+        """
+        Calls func(stats) with a fresh stats dictionary, times
+        it and records the stats under method. Returns the
+        result of func.
+        """
+        stats = new_stats()
+        start = time.perf_counter()
+        try:
+            return func(stats)
+        finally:
+            stats['seconds'] = time.perf_counter() - start
+            self.record(method, stats)
+
+    def record(self, method: str, stats: dict) -> None:
+        """
+        Adds one call's stats to the totals of method and
+        passes them to the hooks
+        """
+        with self._lock:
+            totals = self._totals.get(method)
+            if totals is None:
+                totals = self._totals[method] = dict.fromkeys(COUNTERS, 0)
+                totals.update(calls=0, seconds=0.0, max_seconds=0.0)
+            totals['calls'] += 1
+            totals['seconds'] += stats['seconds']
+            totals['max_seconds'] = max(totals['max_seconds'], stats['seconds'])
+            for counter in COUNTERS:
+                if counter == 'frontier_peak':
+                    totals[counter] = max(totals[counter], stats[counter])
+                else:
+                    totals[counter] += stats[counter]
+
+        for hook in list(self.hooks):
+            hook(method, stats)
+
+        return None
+
+    def summary(self) -> dict:
+        """
+        Returns {method: totals} with the number of calls, total
+        and maximum wall time, summed counters and the largest
+        frontier_peak of each method
+        """
+        with self._lock:
+            return {method: dict(totals) for method, totals in self._totals.items()}
+
+    def reset(self) -> None:
+        """
+        Clears the totals (hooks are kept)
+        """
+        with self._lock:
+            self._totals.clear()
+
+        return None
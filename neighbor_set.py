@@ -0,0 +1,161 @@
+# Author: Joel Swenddal
+# Description: Compact collection of neighbor vertex ids
+
+
+from array import array
+
+
+def _bisect_by_key(values, target, key) -> int:
+    """
+    bisect_left() over values ordered by key(value)
+    """
+    low, high = 0, len(values)
+    while low < high:
+        middle = (low + high) // 2
+        if key(values[middle]) < target:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+class NeighborSet:
+    """
+    Class to implement the neighbors of one vertex, given
+    as integer vertex ids
+    - ids are the keys of a dict, so membership, add and
+      discard are O(1) and iteration follows the order the
+      ids were added in
+    - ordered(key) returns the ids sorted by another key
+      (e.g. vertex name). It is cached; add() and discard()
+      only note the change (O(1)), and the next ordered()
+      call patches the cached array with a binary search per
+      change instead of sorting it again
+    """
+    __slots__ = ('ids', '_ordered', '_key', '_added', '_removed')
+
+    def __init__(self, items=None):
+        self.ids = {} if items is None else dict.fromkeys(items)
+        self._ordered = None
+        self._key = None
+        # changes since _ordered was built: ids added, and ids
+        # removed -> their key when they were removed
+        self._added = None
+        self._removed = None
+
+    def __contains__(self, item):
+        return item in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __bool__(self):
+        return len(self.ids) > 0
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __eq__(self, other):
+        if isinstance(other, NeighborSet):
+            return self.ids.keys() == other.ids.keys()
+        return NotImplemented
+
+    def __repr__(self):
+        return f'NeighborSet({list(self.ids)})'
+
+    def ordered(self, key) -> array:
+        """
+        Returns the ids sorted by key(id). The result is
+        cached (callers must not modify it) and patched with
+        the changes made since the last call, so key must give
+        the same order for as long as an id is in the set.
+        Calling it with a different key sorts again.
+        """
+        ordered = self._ordered
+        if ordered is None or key is not self._key:
+            self._ordered = array('i', sorted(self.ids, key=key))
+            self._key = key
+            self._added = {}
+            self._removed = {}
+            return self._ordered
+
+        removed = self._removed
+        if removed:
+            # removed ids are still in the array, under the key
+            # they had when they were removed
+            def old_key(item):
+                return removed[item] if item in removed else key(item)
+
+            # keys are unique, so the first match is the id itself
+            for item_key in removed.values():
+                del ordered[_bisect_by_key(ordered, item_key, old_key)]
+            removed.clear()
+        if self._added:
+            for item in self._added:
+                ordered.insert(_bisect_by_key(ordered, key(item), key), item)
+            self._added.clear()
+
+        return ordered
+
+    def _check_pending(self) -> None:
+        """
+        Drops the cached key order once patching it would
+        cost more than sorting it again
+        """
+        pending = len(self._added) + len(self._removed)
+        if pending > 64 and pending * 8 > len(self.ids):
+            self._ordered = None
+            self._added = self._removed = None
+
+        return None
+
+    def add(self, item) -> None:
+        """
+        Adds item (no-op if already present)
+        """
+        ids = self.ids
+        if item in ids:
+            return None
+
+        ids[item] = None
+        if self._ordered is not None:
+            self._added[item] = None
+            self._check_pending()
+
+        return None
+
+    def update(self, items) -> None:
+        """
+        Adds every id in items in one call, which is much
+        faster than repeated add() calls for large batches.
+        The key order is sorted again on the next ordered()
+        call.
+        """
+        ids = self.ids
+        size = len(ids)
+        ids.update(dict.fromkeys(items))
+        if len(ids) != size:
+            self._ordered = None
+            self._added = self._removed = None
+
+        return None
+
+    def discard(self, item) -> None:
+        """
+        Removes item if present. The key order must still
+        place item where it was added (e.g. a vertex name is
+        cleared only after its edges are removed).
+        """
+        ids = self.ids
+        if item not in ids:
+            return None
+
+        del ids[item]
+        if self._ordered is not None:
+            if item in self._added:
+                del self._added[item]
+            else:
+                self._removed[item] = self._key(item)
+                self._check_pending()
+
+        return None
@@ -0,0 +1,206 @@
+# Author: Joel Swenddal
+# Description: Vectorized validation of many paths at once
+#
+# validate_paths() on either graph checks a whole batch of paths with
+# a few NumPy operations instead of one is_valid_path() call (and one
+# Python loop per hop) per path. Paths are given as a list of vertex
+# lists, or as a ragged array: one flat array of all the vertices and
+# an offsets array, where path i is values[offsets[i]:offsets[i + 1]].
+#
+# Every hop of every path is checked at once:
+# - directed graphs on the dense / numpy backends look the hop weights
+#   up by fancy indexing into the adjacency matrix
+# - other graphs (sparse and CSR backends, undirected graphs) build
+#   an edge index: the sorted keys u * V + v of every edge, which
+#   np.searchsorted() probes for all hops together (NumPy's
+#   vectorized stand-in for a hash table)
+#
+# The dense matrix array and the edge indexes are cached on the graph
+# and rebuilt only after the graph changes (graph.version), so a batch
+# costs O(hops log E) rather than a pass over the whole graph.
+#
+# Requires NumPy.
+
+try:
+    import numpy as np
+except ImportError:     # only validate_paths() needs numpy
+    np = None
+
+
+def ragged(paths, offsets=None) -> tuple:
+    """
+    Returns (values, offsets) for a list of paths: the flat
+    list of vertices and a NumPy array of path offsets. An
+    existing ragged pair is checked and returned.
+    """
+    if np is None:
+        raise ImportError('validate_paths() requires NumPy')
+
+    if offsets is not None:
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if offsets.ndim != 1 or len(offsets) == 0 or offsets[0] != 0:
+            raise ValueError('offsets must be a 1-D array starting at 0')
+        if np.any(np.diff(offsets) < 0) or offsets[-1] != len(paths):
+            raise ValueError('offsets must be non-decreasing and end at len(values)')
+        return paths, offsets
+
+    paths = list(paths)
+    lengths = np.fromiter((len(path) for path in paths), dtype=np.int64, count=len(paths))
+    offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    values = [vertex for path in paths for vertex in path]
+
+    return values, offsets
+
+
+def _hops(ids, offsets):
+    """
+    Returns (path_ids, src, dst, hop_path_ids) for a ragged
+    batch of vertex ids: the path number of every vertex,
+    and the endpoints and path number of every hop
+    """
+    path_count = len(offsets) - 1
+    path_ids = np.repeat(np.arange(path_count), np.diff(offsets))
+    same_path = path_ids[:-1] == path_ids[1:]
+    return path_ids, ids[:-1][same_path], ids[1:][same_path], path_ids[:-1][same_path]
+
+
+def _edge_lookup(keys, edge_keys, edge_weights):
+    """
+    Returns the weight of every key in the sorted edge_keys
+    index, or 0 where the key is missing. edge_weights None
+    means every edge weighs 1.
+    """
+    if len(edge_keys) == 0:
+        return np.zeros(len(keys))
+    index = np.searchsorted(edge_keys, keys)
+    index[index == len(edge_keys)] = 0
+    found = edge_keys[index] == keys
+    if edge_weights is None:
+        return found.astype(float)
+    return np.where(found, edge_weights[index], 0)
+
+
+def _cached_index(graph, build):
+    """
+    Returns build(graph), reusing the result of an earlier
+    call until the graph changes
+    """
+    cached = graph._path_index
+    if cached is not None and cached[0] == graph.version:
+        return cached[1]
+
+    index = build(graph)
+    graph._path_index = (graph.version, index)
+    return index
+
+
+def _directed_edge_index(graph) -> tuple:
+    """
+    Returns (sorted edge keys src * V + dst, weights) for a
+    DirectedGraph on the sparse or CSR backend
+    """
+    backend = graph._backend
+    v_count = graph.v_count
+    if backend.name == 'csr':
+        # CSR rows are sorted by target, so the keys come out sorted
+        rows = np.repeat(np.arange(v_count, dtype=np.int64),
+                         np.diff(np.asarray(backend.offsets)))
+        return rows * v_count + np.asarray(backend.targets), np.asarray(backend.weights)
+
+    edges = np.array(list(backend.edges()), dtype=float).reshape(-1, 3)
+    edge_keys = edges[:, 0].astype(np.int64) * v_count + edges[:, 1].astype(np.int64)
+    order = np.argsort(edge_keys)
+    return edge_keys[order], edges[order, 2]
+
+
+def _undirected_edge_index(graph):
+    """
+    Returns the sorted keys u * id_count + v of every edge
+    of an UndirectedGraph, in both directions
+    """
+    id_count = len(graph._names)
+    heads, tails = [], []
+    for v_id, neighbors in enumerate(graph._adj):
+        if neighbors is not None:
+            heads.append(np.full(len(neighbors), v_id, dtype=np.int64))
+            tails.append(np.fromiter(neighbors, dtype=np.int64, count=len(neighbors)))
+    if not heads:
+        return np.zeros(0, dtype=np.int64)
+    return np.sort(np.concatenate(heads) * id_count + np.concatenate(tails))
+
+
+def _result(path_count, bad_paths, hop_paths, hop_weights, weights):
+    """
+    Combines per-path failure counts into the validate_paths()
+    result, with total weights (NaN for invalid paths) if
+    weights is True
+    """
+    valid = bad_paths == 0
+    if not weights:
+        return valid
+
+    totals = np.bincount(hop_paths, weights=hop_weights, minlength=path_count)
+    totals[~valid] = np.nan
+    return valid, totals
+
+
+def validate_directed(graph, paths, offsets=None, weights=False):
+    """
+    validate_paths() for a DirectedGraph (see its docstring)
+    """
+    values, offsets = ragged(paths, offsets)
+    ids = np.asarray(values, dtype=np.int64)
+    v_count = graph.v_count
+    path_count = len(offsets) - 1
+
+    path_ids, src, dst, hop_paths = _hops(ids, offsets)
+
+    # out-of-range vertices fail their path; look hops up as vertex 0
+    in_range = (ids >= 0) & (ids < v_count)
+    if graph._removed:
+        in_range &= ~np.isin(ids, np.fromiter(graph._removed, dtype=np.int64))
+    bad = np.bincount(path_ids[~in_range], minlength=path_count)
+    src = np.where((src >= 0) & (src < v_count), src, 0)
+    dst = np.where((dst >= 0) & (dst < v_count), dst, 0)
+
+    backend = graph._backend
+    if v_count == 0:
+        hop_weights = np.zeros(len(src))
+    elif backend.name == 'numpy':
+        hop_weights = backend.matrix[src, dst]
+    elif backend.name == 'dense':
+        # converting the list-of-lists matrix is O(V^2): done once per version
+        matrix = _cached_index(graph, lambda g: np.asarray(g._backend.matrix))
+        hop_weights = matrix[src, dst]
+    else:
+        edge_keys, edge_weights = _cached_index(graph, _directed_edge_index)
+        hop_weights = _edge_lookup(src * v_count + dst, edge_keys, edge_weights)
+
+    bad += np.bincount(hop_paths[hop_weights <= 0], minlength=path_count)
+
+    return _result(path_count, bad, hop_paths, hop_weights, weights)
+
+
+def validate_undirected(graph, paths, offsets=None, weights=False):
+    """
+    validate_paths() for an UndirectedGraph (see its docstring)
+    """
+    values, offsets = ragged(paths, offsets)
+    lookup = graph._ids.get
+    ids = np.fromiter((lookup(name, -1) for name in values), dtype=np.int64,
+                      count=len(values))
+    id_count = len(graph._names)
+    path_count = len(offsets) - 1
+
+    path_ids, src, dst, hop_paths = _hops(ids, offsets)
+    bad = np.bincount(path_ids[ids < 0], minlength=path_count)
+
+    edge_keys = _cached_index(graph, _undirected_edge_index)
+
+    # hops touching an unknown vertex (id -1) get key -1, which matches nothing
+    keys = np.where((src >= 0) & (dst >= 0), src * id_count + dst, -1)
+    hop_weights = _edge_lookup(keys, edge_keys, None)
+    bad += np.bincount(hop_paths[hop_weights <= 0], minlength=path_count)
+
+    return _result(path_count, bad, hop_paths, hop_weights, weights)
@@ -0,0 +1,190 @@
+# Author: Joel Swenddal
+# Description: Precomputed reachability index for DirectedGraph
+#
+# The index answers "can u reach v?" without searching the graph:
+#
+# 1. the strongly connected components are found with an iterative
+#    Tarjan search; all vertices of one component reach each other,
+#    and the components form a DAG (the condensation)
+# 2. a depth-first spanning forest of the DAG numbers the components
+#    in postorder, so each component's forest subtree is one interval
+#    of numbers [low, post]
+# 3. each component's label is the list of intervals covering every
+#    component it reaches: its own subtree interval merged with the
+#    labels of its DAG successors (tree-cover labels, Agrawal et al.
+#    1989). Tarjan numbers components in reverse topological order,
+#    so visiting them in increasing order finishes every successor's
+#    label first
+# 4. can_reach(u, v) is a binary search for the postorder number of
+#    v's component among the intervals of u's component
+#
+# Trees and chains need one interval per component; dense DAGs need
+# more, but far less memory than a bitset per component (C^2 bits).
+#
+# The index remembers the graph version it was built for and raises
+# StaleIndexError if it is queried after the graph has changed.
+
+from array import array
+from bisect import bisect_right
+
+from graph_traversal import strongly_connected_components
+
+
+class StaleIndexError(RuntimeError):
+    """
+    Raised when a ReachabilityIndex is queried after its
+    graph has changed
+    """
+
+
+class ReachabilityIndex:
+    """
+    Class to implement a reachability index over a
+    DirectedGraph (see the module description)
+    - component[v] is the strongly connected component of v
+    - version is the graph version the index was built for
+    - intervals of component c are starts / ends
+      [offsets[c]:offsets[c + 1]], sorted and disjoint
+    """
+
+    def __init__(self, graph):
+        """
+        Builds the index for the current state of graph
+        """
+        successors = graph._backend.successors
+        v_count = graph.v_count
+
+        self._graph = graph
+        self.version = graph.version
+        self._removed = frozenset(graph._removed)
+        self.component, self.count = strongly_connected_components(v_count, successors)
+
+        # successor components of each component (the condensed DAG)
+        component = self.component
+        dag = [set() for _ in range(self.count)]
+        for v in range(v_count):
+            c = component[v]
+            for w in successors(v):
+                if component[w] != c:
+                    dag[c].add(component[w])
+        dag = [sorted(targets) for targets in dag]
+
+        low, self.post = self._number(dag)
+        self._label(dag, low)
+
+    def _number(self, dag) -> tuple:
+        """
+        Numbers the components in postorder of a depth-first
+        spanning forest of the DAG. Returns (low, post): the
+        subtree of c holds exactly the numbers low[c] .. post[c].
+        """
+        low = array('i', [0]) * self.count
+        post = array('i', [-1]) * self.count
+        visited = bytearray(self.count)
+        counter = 0
+
+        # the highest numbers are sources of the DAG
+        for root in range(self.count - 1, -1, -1):
+            if visited[root]:
+                continue
+            visited[root] = 1
+            low[root] = counter
+            stack = [(root, iter(dag[root]))]
+
+            while stack:
+                c, remaining = stack[-1]
+                for d in remaining:
+                    if not visited[d]:
+                        visited[d] = 1
+                        low[d] = counter
+                        stack.append((d, iter(dag[d])))
+                        break
+                else:
+                    stack.pop()
+                    post[c] = counter
+                    counter += 1
+
+        return low, post
+
+    def _label(self, dag, low) -> None:
+        """
+        Builds the merged interval list of every component
+        """
+        post = self.post
+        starts = array('i')
+        ends = array('i')
+        offsets = array('q', [0])
+
+        for c in range(self.count):
+            intervals = [(low[c], post[c])]
+            for d in dag[c]:
+                begin, end = offsets[d], offsets[d + 1]
+                intervals.extend(zip(starts[begin:end], ends[begin:end]))
+            intervals.sort()
+
+            # merge overlapping and adjacent intervals
+            merged_start, merged_end = intervals[0]
+            for start, end in intervals:
+                if start > merged_end + 1:
+                    starts.append(merged_start)
+                    ends.append(merged_end)
+                    merged_start = start
+                if end > merged_end:
+                    merged_end = end
+            starts.append(merged_start)
+            ends.append(merged_end)
+            offsets.append(len(starts))
+
+        self._starts, self._ends, self._offsets = starts, ends, offsets
+
+        return None
+
+    @property
+    def is_current(self) -> bool:
+        """
+        True if the graph has not changed since the index was
+        built
+        """
+        return self._graph.version == self.version
+
+    @property
+    def label_size(self) -> int:
+        """
+        Total number of intervals stored
+        """
+        return len(self._starts)
+
+    def can_reach(self, u: int, v: int) -> bool:
+        """
+        Returns True if there is a path from u to v (every
+        vertex reaches itself), False otherwise or if either
+        vertex is not in the graph. Raises StaleIndexError if
+        the graph has changed since the index was built.
+        """
+        if not self.is_current:
+            raise StaleIndexError('graph changed since the reachability index was built')
+        if u < 0 or v < 0 or u >= len(self.component) or v >= len(self.component):
+            return False
+        if u in self._removed or v in self._removed:
+            return False
+
+        cu, cv = self.component[u], self.component[v]
+        if cv > cu:
+            # no edge leads to a higher component number
+            return False
+
+        target = self.post[cv]
+        begin, end = self._offsets[cu], self._offsets[cu + 1]
+        index = bisect_right(self._starts, target, begin, end) - 1
+        return index >= begin and self._ends[index] >= target
+
+    def components(self) -> list:
+        """
+        Returns the strongly connected components as lists of
+        vertices, in reverse topological order
+        """
+        groups = [[] for _ in range(self.count)]
+        for v, c in enumerate(self.component):
+            if v not in self._removed:
+                groups[c].append(v)
+        return [group for group in groups if group]
@@ -0,0 +1,345 @@
+# Author: Joel Swenddal
+# Description: Shortest path searches over a neighbor function,
+#              shared by the graph classes
+
+import heapq
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from instrumentation import counting_neighbors, sample_frontier
+
+try:
+    import numpy as np
+except ImportError:     # numpy is only needed for array results
+    np = None
+
+
+def dijkstra_search(src, out_edges, target=None, stats=None):
+    """
+    Heap-based Dijkstra search from src. out_edges(v) must
+    return (neighbor, weight) pairs for the out-edges of v.
+    Returns (distances, predecessors) dictionaries covering
+    the vertices reached. If a target is given the search
+    stops as soon as the target is settled; distances of
+    vertices that were not settled by then may not be final.
+    If stats is a dictionary from instrumentation.new_stats(),
+    the search adds its counters to it.
+    """
+    distances = {src: 0}
+    predecessors = {src: None}
+    settled = set()
+    heap = [(0, src)]
+
+    if stats is not None:
+        out_edges = counting_neighbors(out_edges, stats)
+        sample_frontier(stats, heap)
+
+    while heap:
+        distance, vertex = heapq.heappop(heap)
+
+        # skip stale heap entries for vertices already settled
+        if vertex in settled:
+            if stats is not None:
+                stats['stale'] += 1
+            continue
+        settled.add(vertex)
+
+        if vertex == target:
+            break
+
+        for neighbor, weight in out_edges(vertex):
+            new_distance = distance + weight
+            if neighbor not in distances or new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                predecessors[neighbor] = vertex
+                heapq.heappush(heap, (new_distance, neighbor))
+        if stats is not None:
+            sample_frontier(stats, heap)
+
+    if stats is not None:
+        sample_frontier(stats, heap)
+        pops = len(settled) + stats['stale']
+        stats['vertices'] += len(settled)
+        stats['pops'] += pops
+        stats['pushes'] += pops + len(heap)
+
+    return distances, predecessors
+
+
+def reconstruct_path(predecessors, dst) -> list:
+    """
+    Follows the predecessor chain back from dst and returns
+    the path from the source to dst, or an empty list if dst
+    was not reached
+    """
+    if dst not in predecessors:
+        return []
+
+    path = []
+    vertex = dst
+    while vertex is not None:
+        path.append(vertex)
+        vertex = predecessors[vertex]
+    path.reverse()
+
+    return path
+
+
+def bidirectional_search(src, dst, out_edges, in_edges) -> tuple:
+    """
+    Bidirectional Dijkstra search between src and dst. Runs
+    a forward search over out_edges(v) and a backward search
+    over in_edges(v) (both returning (neighbor, weight) pairs),
+    always advancing the side with the smaller frontier key,
+    and stops once the two frontiers cannot improve the best
+    meeting point. Returns (distance, path), or (inf, []) if
+    dst is not reachable.
+    """
+    if src == dst:
+        return 0, [src]
+
+    # index 0 is the forward search, index 1 the backward search
+    edge_funcs = (out_edges, in_edges)
+    distances = ({src: 0}, {dst: 0})
+    predecessors = ({src: None}, {dst: None})
+    settled = (set(), set())
+    heaps = ([(0, src)], [(0, dst)])
+
+    best = float('inf')
+    meeting = None
+
+    while heaps[0] and heaps[1]:
+        # no path through an unsettled vertex can beat `best`
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        other = 1 - side
+
+        distance, vertex = heapq.heappop(heaps[side])
+        if vertex in settled[side]:
+            continue
+        settled[side].add(vertex)
+
+        side_distances = distances[side]
+        other_distances = distances[other]
+        for neighbor, weight in edge_funcs[side](vertex):
+            new_distance = distance + weight
+            if neighbor not in side_distances or new_distance < side_distances[neighbor]:
+                side_distances[neighbor] = new_distance
+                predecessors[side][neighbor] = vertex
+                heapq.heappush(heaps[side], (new_distance, neighbor))
+
+            # the edge connects the two searches
+            if neighbor in other_distances:
+                total = side_distances[neighbor] + other_distances[neighbor]
+                if total < best:
+                    best = total
+                    meeting = neighbor
+
+    if meeting is None:
+        return float('inf'), []
+
+    # forward half src..meeting, then follow the backward
+    # predecessors from meeting on to dst
+    path = reconstruct_path(predecessors[0], meeting)
+    vertex = predecessors[1][meeting]
+    while vertex is not None:
+        path.append(vertex)
+        vertex = predecessors[1][vertex]
+
+    return best, path
+
+
+def astar_search(src, dst, out_edges, heuristic) -> tuple:
+    """
+    A* search from src to dst. heuristic(v, dst) must never
+    overestimate the remaining distance from v to dst
+    (admissible); vertices are re-opened if a shorter path is
+    found later, so it does not also need to be consistent.
+    Returns (distance, path), or (inf, []) if dst is not
+    reachable.
+    """
+    distances = {src: 0}
+    predecessors = {src: None}
+    # heap entries are (estimated total, distance so far, vertex)
+    heap = [(heuristic(src, dst), 0, src)]
+
+    while heap:
+        _, distance, vertex = heapq.heappop(heap)
+
+        # skip stale heap entries
+        if distance > distances[vertex]:
+            continue
+
+        if vertex == dst:
+            return distance, reconstruct_path(predecessors, dst)
+
+        for neighbor, weight in out_edges(vertex):
+            new_distance = distance + weight
+            if neighbor not in distances or new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                predecessors[neighbor] = vertex
+                heapq.heappush(heap, (new_distance + heuristic(neighbor, dst),
+                                      new_distance, neighbor))
+
+    return float('inf'), []
+
+
+class ShortestPathCache:
+    """
+    LRU cache of single-source shortest path results, keyed
+    by source vertex. Every entry belongs to one graph version;
+    looking up with a newer version discards the whole cache,
+    so results never outlive a mutation of the graph.
+    - maxsize bounds the number of cached sources
+    - hits / misses count lookups, for sizing the cache
+    - lookups and updates hold an internal lock, so one cache
+      can serve several reader threads
+    """
+
+    def __init__(self, maxsize=128):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.version = None
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # locks cannot be pickled; the copy gets a new one
+        state = dict(self.__dict__)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, src, version):
+        """
+        Returns the cached result for src computed at the given
+        graph version, or None (counted as a miss)
+        """
+        with self._lock:
+            if version != self.version:
+                self.entries.clear()
+                self.version = version
+
+            result = self.entries.get(src)
+            if result is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(src)
+            self.hits += 1
+            return result
+
+    def put(self, src, version, result) -> None:
+        """
+        Stores the result for src, evicting the least recently
+        used source if the cache is full
+        """
+        with self._lock:
+            if version != self.version:
+                self.entries.clear()
+                self.version = version
+
+            self.entries[src] = result
+            self.entries.move_to_end(src)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Drops every cached result (counters are kept)
+        """
+        with self._lock:
+            self.entries.clear()
+
+    def info(self) -> dict:
+        """
+        Returns the cache counters and size as a dictionary
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'size': len(self.entries),
+                'maxsize': self.maxsize}
+
+
+def distance_row(graph, src) -> list:
+    """
+    Returns the list of shortest distances from src to every
+    vertex of graph (any object with v_count and out_edges(v)),
+    with inf for unreachable vertices. Every entry is inf if
+    src is not a vertex of graph.
+    """
+    if src < 0 or src >= graph.v_count:
+        return [float('inf')] * graph.v_count
+
+    distances, _ = dijkstra_search(src, graph.out_edges)
+    return [distances.get(vertex, float('inf')) for vertex in range(graph.v_count)]
+
+
+# read-only graph shipped to each pool worker once, by _init_worker()
+_worker_graph = None
+
+
+def _init_worker(graph) -> None:
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _worker_distance_row(src) -> list:
+    return distance_row(_worker_graph, src)
+
+
+def multi_source_distances(graph, sources, workers=None) -> list:
+    """
+    Returns a list with one distance_row() per source. With
+    workers > 1 the searches run in a process pool; graph
+    should then be a compact read-only snapshot (CSRGraph),
+    which is pickled once per worker rather than per source.
+    """
+    sources = list(sources)
+
+    if workers is None or workers <= 1 or len(sources) <= 1:
+        return [distance_row(graph, src) for src in sources]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(graph,)) as pool:
+        chunksize = max(1, len(sources) // (workers * 4))
+        return list(pool.map(_worker_distance_row, sources, chunksize=chunksize))
+
+
+def floyd_warshall(v_count, edges):
+    """
+    All-pairs shortest distances for a graph given as v_count
+    and (src, dst, weight) edges, using Floyd-Warshall with
+    each of the V rounds vectorized over the whole matrix.
+    O(V^3) work and O(V^2) memory, so only suited to small or
+    dense graphs. Returns a float64 NumPy array with inf for
+    unreachable pairs. Requires NumPy.
+    """
+    if np is None:
+        raise ImportError('floyd_warshall() requires NumPy')
+
+    dist = np.full((v_count, v_count), np.inf)
+    edge_list = list(edges)
+    if edge_list:
+        src, dst, weight = (np.array(column) for column in zip(*edge_list))
+        dist[src, dst] = weight
+    np.fill_diagonal(dist, 0)
+
+    for k in range(v_count):
+        # best path i -> j allowed to pass through vertex k
+        np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+
+    return dist
@@ -1,8 +1,15 @@
 # Author: Joel Swenddal
 # Description: Undirected Graph Implementation -- using Adjacency List
 
+from array import array
+from collections.abc import Mapping
 
-from collections import deque
+from csr_graph import CSRAdjacency
+from disjoint_set import DisjointSet
+from graph_traversal import iter_bfs, iter_dfs
+from instrumentation import Instrumentation
+from neighbor_set import NeighborSet
+from path_validation import validate_undirected
 
 
 class UndirectedGraph:
@@ -12,20 +19,42 @@ class UndirectedGraph:
     - loops not allowed
     - no edge weights
     - vertex names are strings
+    - names are interned to dense integer ids; each vertex's
+      neighbors are kept as a compact NeighborSet of ids
     """
 
     def __init__(self, start_edges=None):
         """
-        Store graph info as adjacency list
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Store graph info as adjacency list indexed by vertex id
         """
-        self.adj_list = dict()
+        # name -> id and id -> name (None for a removed vertex)
+        self._ids = {}
+        self._names = []
+        # id -> NeighborSet of neighbor ids (None for a removed vertex)
+        self._adj = []
+        # ids of removed vertices, reused by the next new vertices
+        self._free_ids = []
+        # sort key that orders vertex ids by name
+        self._name_key = self._names.__getitem__
+        self.instrumentation = None
+        # bumped by every mutation; used to invalidate cached results
+        self.version = 0
+        # (version, edge key index) for validate_paths()
+        self._path_index = None
 
         # populate graph with initial vertices and edges (if provided)
-        # before using, implement add_vertex() and add_edge() methods
         if start_edges is not None:
-            for u, v in start_edges:
-                self.add_edge(u, v)
+            self.add_edges_bulk(start_edges)
+
+    @classmethod
+    def from_edges(cls, edges):
+        """
+        Builds a graph from any iterable (including generators)
+        of (u, v) pairs in a single pass. See add_edges_bulk().
+        """
+        graph = cls()
+        graph.add_edges_bulk(edges)
+        return graph
 
     def __str__(self):
         """
@@ -39,14 +68,88 @@ class UndirectedGraph:
             return f'GRAPH: {{{out}}}'
         return f'GRAPH: {{\n  {out}}}'
 
+    def _csr_arrays(self) -> tuple:
+        """
+        Returns (names, offsets, targets): the vertex names in
+        sorted order and the CSR adjacency of the graph with
+        vertices renumbered in that order, so each row is
+        already in the order traversals visit neighbors in
+        """
+        live = sorted((self._names[v_id], v_id) for v_id in self._live_ids())
+        new_ids = {v_id: index for index, (_, v_id) in enumerate(live)}
+
+        offsets = array('q', [0])
+        targets = array('i')
+        for _, v_id in live:
+            targets.extend(sorted(new_ids[n_id] for n_id in self._adj[v_id]))
+            offsets.append(len(targets))
+
+        return [name for name, _ in live], offsets, targets
+
+    def freeze(self):
+        """
+        Returns an immutable, hashable FrozenUndirectedGraph
+        snapshot of the graph (later changes to the graph do
+        not affect it)
+        """
+        return FrozenUndirectedGraph(*self._csr_arrays())
+
+    def save(self, path) -> None:
+        """
+        Writes the graph to path in the binary snapshot format
+        (see graph_snapshot.py); read it back with
+        graph_snapshot.load()
+        """
+        from graph_snapshot import save
+        save(self, path)
+
+        return None
+
+    @property
+    def adj_list(self):
+        """
+        Read-only mapping of vertex name -> list of neighbor
+        names in the order the edges were added (lists are
+        built on access)
+        """
+        return _AdjacencyView(self)
+
     # ------------------------------------------------------------------ #
 
+    def _intern(self, v) -> int:
+        """
+        Returns the id of vertex v, adding v if it is new
+        """
+        v_id = self._ids.get(v)
+        if v_id is not None:
+            return v_id
+
+        if self._free_ids:
+            v_id = self._free_ids.pop()
+            self._adj[v_id] = NeighborSet()
+            self._names[v_id] = v
+        else:
+            v_id = len(self._names)
+            self._adj.append(NeighborSet())
+            self._names.append(v)
+        self._ids[v] = v_id
+
+        return v_id
+
+    def _live_ids(self):
+        """
+        Yields the ids of the vertices in the graph
+        """
+        for v_id, neighbors in enumerate(self._adj):
+            if neighbors is not None:
+                yield v_id
+
     def add_vertex(self, v: str) -> None:
         """
         Add new vertex to the graph
         """
-        if v not in self.adj_list:
-            self.adj_list[v] = []
+        self._intern(v)
+        self.version += 1
 
         return None
 
@@ -57,17 +160,51 @@ class UndirectedGraph:
         if u == v:
             return None
 
-        if u not in self.adj_list:
-            self.add_vertex(u)
+        u_id = self._intern(u)
+        v_id = self._intern(v)
 
-        if v not in self.adj_list:
-            self.add_vertex(v)
+        self._adj[u_id].add(v_id)
+        self._adj[v_id].add(u_id)
+        self.version += 1
 
-        if v not in self.adj_list[u]:
-            self.adj_list[u].append(v)
+        return None
 
-        if u not in self.adj_list[v]:
-            self.adj_list[v].append(u)
+    def add_edges_bulk(self, edges) -> None:
+        """
+        Adds edges from any iterable (including generators) of
+        (u, v) pairs in a single pass. Gives the same result as
+        calling add_edge() for each pair; new neighbor ids are
+        collected per vertex and merged into each NeighborSet
+        with one sort at the end.
+        """
+        ids = self._ids
+        intern = self._intern
+        pending = {}
+
+        for u, v in edges:
+            if u == v:
+                continue
+
+            u_id = ids.get(u)
+            if u_id is None:
+                u_id = intern(u)
+            v_id = ids.get(v)
+            if v_id is None:
+                v_id = intern(v)
+
+            u_pending = pending.get(u_id)
+            if u_pending is None:
+                u_pending = pending[u_id] = array('i')
+            u_pending.append(v_id)
+
+            v_pending = pending.get(v_id)
+            if v_pending is None:
+                v_pending = pending[v_id] = array('i')
+            v_pending.append(u_id)
+
+        for v_id, new_ids in pending.items():
+            self._adj[v_id].update(new_ids)
+        self.version += 1
 
         return None
 
@@ -79,15 +216,15 @@ class UndirectedGraph:
         if v == u:
             return None
 
-        elif v not in self.adj_list or u not in self.adj_list:
+        elif v not in self._ids or u not in self._ids:
             return None
 
-        elif v not in self.adj_list[u]:
-            return None
+        v_id = self._ids[v]
+        u_id = self._ids[u]
 
-        else:
-            self.adj_list[u].remove(v)
-            self.adj_list[v].remove(u)
+        self._adj[u_id].discard(v_id)
+        self._adj[v_id].discard(u_id)
+        self.version += 1
 
         return None
 
@@ -95,17 +232,18 @@ class UndirectedGraph:
         """
         Remove vertex and all connected edges
         """
+        v_id = self._ids.get(v)
+        if v_id is None:
+            return None
 
-        if v in self.adj_list:
+        for neighbor in self._adj[v_id]:
+            self._adj[neighbor].discard(v_id)
 
-            # if list is empty
-            if not self.adj_list[v]:
-                self.adj_list.pop(v)
-                return None
-            # not empty
-            for node in self.adj_list[v]:
-                self.adj_list[node].remove(v)
-            self.adj_list.pop(v)
+        self._adj[v_id] = None
+        self._names[v_id] = None
+        del self._ids[v]
+        self._free_ids.append(v_id)
+        self.version += 1
 
         return None
 
@@ -113,13 +251,7 @@ class UndirectedGraph:
         """
         Return list of vertices in the graph (any order)
         """
-
-        if not self.adj_list:
-            return []
-
-        vertice_list = list(self.adj_list.keys())
-
-        return vertice_list
+        return list(self._ids)
 
     def get_edges(self) -> list:
         """
@@ -127,20 +259,25 @@ class UndirectedGraph:
         Edges are represented as tuples with two elements
         (the two adjacent vertices).
         """
-        node_list = self.get_vertices()
-        edge_list = []
-
-        if not node_list:
-            return node_list
-
-        for node in node_list:
-            for edge in self.adj_list[node]:
-                if self.adj_list[node]:
-                    edge_tup = (node, edge) if node < edge else (edge, node)
-                if edge_tup not in edge_list:
-                    edge_list.append(edge_tup)
+        return list(self.iter_edges())
 
-        return edge_list
+    def iter_edges(self):
+        """
+        Generator yielding each edge exactly once as a
+        (smaller vertex, larger vertex) tuple, in O(V + E)
+        without building any intermediate collection
+        """
+        names = self._names
+
+        for u_id, neighbors in enumerate(self._adj):
+            if neighbors is None:
+                continue
+            u = names[u_id]
+            for v_id in neighbors:
+                # each edge is stored at both ends; emit it once
+                if u_id < v_id:
+                    v = names[v_id]
+                    yield (u, v) if u < v else (v, u)
 
     def is_valid_path(self, path: list) -> bool:
         """
@@ -150,212 +287,302 @@ class UndirectedGraph:
             return True
 
         if len(path) == 1:
-            if path[0] in self.adj_list.keys():
+            if path[0] in self._ids:
                 return True
             else:
                 return False
 
         index = 0
-        current = path[index]
-        next = path[index + 1]
 
         while index < len(path)-1:
-            current = path[index]
-            next = path[index + 1]
-            if next not in self.adj_list[current]:
+            # like indexing the adjacency list, an unknown
+            # current vertex raises KeyError
+            current = self._ids[path[index]]
+            next = self._ids.get(path[index + 1])
+            if next is None or next not in self._adj[current]:
                 return False
 
             index += 1
 
         return True
 
-    def dfs(self, v_start, v_end=None) -> list:
+    def validate_paths(self, paths, offsets=None, weights=False):
         """
-        Takes a starting vertex and optional ending
-        vertice. Returns list of vertices visited during 
-        DFS search. Vertices are picked in alphabetical order
+        Batch version of is_valid_path(). paths is a list of
+        vertex lists, or a flat sequence of vertices if offsets
+        is given (path i is paths[offsets[i]:offsets[i + 1]]).
+        Returns a NumPy bool array with one entry per path, or
+        (valid, hops) if weights is True, where hops holds the
+        number of edges of each path (NaN for invalid paths).
+        Unlike is_valid_path(), an unknown vertex anywhere in a
+        path makes it invalid rather than raising KeyError.
+        Requires NumPy.
         """
-        path_list = []
+        return validate_undirected(self, paths, offsets, weights)
 
-        if v_start not in self.adj_list:
-            return path_list
+    def _sorted_neighbors(self, v_id) -> array:
+        """
+        Returns the neighbor ids of v_id in alphabetical order
+        of their names (cached until v_id's edges change)
+        """
+        return self._adj[v_id].ordered(self._name_key)
 
-        if v_end not in self.adj_list:
-            v_end = None
+    def _traverse(self, engine, v_start, id_stop, max_depth, details, stats=None):
+        """
+        Runs a traversal engine over vertex ids and translates
+        the results back to names
+        """
+        start_id = self._ids.get(v_start)
+        if start_id is None:
+            return iter(())
 
-        if v_end == v_start:
-            path_list.append(v_start)
-            return path_list
+        names = self._names
+        visits = engine(start_id, self._sorted_neighbors,
+                        id_stop, max_depth, details, stats)
 
-        # push starting vertice onto stack
-        current = v_start
-        stack = [current]
+        if details:
+            return ((names[v_id], depth, None if parent is None else names[parent])
+                    for v_id, depth, parent in visits)
+        return map(names.__getitem__, visits)
 
-        # while stack not empty
-        while stack and current != v_end:
-            current = stack.pop()
-            if current not in path_list:
-                path_list.append(current)
+    def _id_predicate(self, stop):
+        """
+        Wraps a predicate on names as a predicate on ids
+        """
+        if stop is None:
+            return None
+        names = self._names
+        return lambda v_id: stop(names[v_id])
 
-            sorted_list = sorted(self.adj_list[current], reverse=True)
+    def _end_predicate(self, v_end):
+        """
+        Returns an id-based stop predicate matching v_end,
+        or None if v_end is not a vertex
+        """
+        end_id = self._ids.get(v_end)
+        if end_id is None:
+            return None
+        return lambda v_id: v_id == end_id
 
-            for neighbor in sorted_list:
+    def iter_dfs(self, v_start, stop=None, max_depth=None, details=False,
+                 stats=None):
+        """
+        Generator version of dfs(). Yields vertices as they are
+        visited, or (vertex, depth, parent) tuples if details
+        is True. The search ends after yielding a vertex for
+        which the optional stop predicate returns True, and
+        vertices at depth max_depth are not expanded. Yields
+        nothing if v_start is not in the graph. Counters are
+        added to the optional stats dictionary (see
+        instrumentation.py).
+        """
+        return self._traverse(iter_dfs, v_start, self._id_predicate(stop),
+                              max_depth, details, stats)
 
-                if neighbor not in path_list:
-                    stack.append(neighbor)
+    def iter_bfs(self, v_start, stop=None, max_depth=None, details=False,
+                 stats=None):
+        """
+        Generator version of bfs(). Takes the same arguments
+        as iter_dfs().
+        """
+        return self._traverse(iter_bfs, v_start, self._id_predicate(stop),
+                              max_depth, details, stats)
 
-        return path_list
+    def dfs(self, v_start, v_end=None) -> list:
+        """
+        Takes a starting vertex and optional ending
+        vertice. Returns list of vertices visited during 
+        DFS search. Vertices are picked in alphabetical order
+        """
+        return self._search('dfs', iter_dfs, v_start, v_end)
 
     def bfs(self, v_start, v_end=None) -> list:
         """
         Return list of vertices visited during BFS search
         Vertices are picked in alphabetical order
         """
-        path_list = []
+        return self._search('bfs', iter_bfs, v_start, v_end)
 
-        if v_start not in self.adj_list:
-            return path_list
+    def _search(self, method, engine, v_start, v_end) -> list:
+        """
+        Runs dfs() / bfs(), recording statistics if
+        instrumentation is enabled
+        """
+        stop = self._end_predicate(v_end)
+        if self.instrumentation is not None:
+            return self.instrumentation.measure(
+                method, lambda stats: list(self._traverse(
+                    engine, v_start, stop, None, False, stats)))
 
-        if v_end not in self.adj_list:
-            v_end = None
+        return list(self._traverse(engine, v_start, stop, None, False))
 
-        if v_end == v_start:
-            path_list.append(v_start)
-            return path_list
+    def enable_instrumentation(self, registry=None) -> Instrumentation:
+        """
+        Turns on per-call statistics for dfs() and bfs() (see
+        instrumentation.py) and returns the registry collecting
+        them. Pass an existing registry to share it between
+        graphs.
+        """
+        if registry is None:
+            registry = Instrumentation()
+        self.instrumentation = registry
 
-        # push starting vertice into queue
-        current = v_start
-        queue = deque([current])
+        return registry
 
-        # while queue not empty
-        while queue and current != v_end:
-            current = queue.popleft()
-            if current not in path_list:
-                path_list.append(current)
+    def disable_instrumentation(self) -> None:
+        """
+        Turns off per-call statistics
+        """
+        self.instrumentation = None
 
-            sorted_list = sorted(self.adj_list[current], reverse=False)
+        return None
 
-            for neighbor in sorted_list:
+    def _union_edges(self, stop_on_cycle=False):
+        """
+        Builds a DisjointSet over the vertex ids and unions the
+        endpoints of every edge (each edge is processed once,
+        from its smaller id). Returns (components, found
+        cycle); with stop_on_cycle it returns as soon as an
+        edge joins two vertices that are already connected.
+        """
+        components = DisjointSet(self._live_ids())
 
-                if neighbor not in path_list:
-                    queue.append(neighbor)
+        for u_id, neighbors in enumerate(self._adj):
+            if neighbors is None:
+                continue
+            for v_id in neighbors:
+                if u_id < v_id and not components.union(u_id, v_id) and stop_on_cycle:
+                    return components, True
 
-        return path_list
+        return components, False
 
     def count_connected_components(self):
         """
         Return number of connected componets in the graph
         """
-        visited_dict = {}
-        vertices = self.get_vertices()
-        # visited dictionary to track visited vertices
-        # initialize all to False
-        for each in vertices:
-            visited_dict[each] = False
-
-        connected_count = 0
+        components, _ = self._union_edges()
+        return components.count
 
-        # check each vertice
-        for each in vertices:
-            # if it has not yet been visited, run dfs + update
-            #  the visits dict
-            if visited_dict[each] == False:
-                self.dfs_helper(each, visited_dict)
-                connected_count += 1
-
-        return connected_count
+    def connected_components(self) -> list:
+        """
+        Return list of connected components, each one a set
+        of vertices
+        """
+        components, _ = self._union_edges()
+        names = self._names
+        return [{names[v_id] for v_id in group} for group in components.groups()]
 
-    def dfs_helper(self, v_start, visited_dict) -> None:
+    def has_cycle(self):
         """
-        DFS helper function for count_connected_components() method.
-        Takes a starting point and a list of bools indicating
-        vertices that have been visited. Updates dict to True
-        for any vertices visited during the dfs.
+        Return True if graph contains a cycle, False otherwise
         """
+        _, found_cycle = self._union_edges(stop_on_cycle=True)
+        return found_cycle
 
-        visited_dict[v_start] = True
-        path_list = []
 
-        if v_start not in self.adj_list:
-            return None
+class FrozenUndirectedGraph(UndirectedGraph):
+    """
+    Immutable UndirectedGraph over packed CSR arrays
+    (see UndirectedGraph.freeze() and graph_snapshot.load())
+    - vertex ids are numbered in name order, so neighbor
+      rows are stored pre-sorted and dfs() / bfs() never
+      sort
+    - every query method works; methods that change the
+      graph raise TypeError
+    - degree is an array indexed by vertex id (the position
+      of the vertex in get_vertices())
+    - hashable and comparable by content; it has no mutable
+      state, so it can be shared by threads without locking
+    """
 
-        # push starting vertice onto stack
-        current = v_start
-        stack = [current]
+    def __init__(self, names, offsets, targets):
+        """
+        Store graph info from sorted vertex names and the CSR
+        adjacency built over their positions
+        """
+        super().__init__()
+        self._names[:] = names
+        self._ids = {name: v_id for v_id, name in enumerate(names)}
+        self._adj = CSRAdjacency(offsets, targets)
+        self._degree = None
+        self._hash = None
+
+    @property
+    def degree(self):
+        """
+        Degree of every vertex (an array, built on first use)
+        """
+        if self._degree is None:
+            self._degree = self._adj.degrees()
+        return self._degree
 
-        # while stack not empty
-        while stack:
-            current = stack.pop()
-            if current not in path_list:
-                path_list.append(current)
-                visited_dict[current] = True
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash((tuple(self._names), self._adj.content_key()))
+        return self._hash
 
-            for neighbor in self.adj_list[current]:
+    def __eq__(self, other):
+        if isinstance(other, FrozenUndirectedGraph):
+            return (self._names == other._names
+                    and self._adj.content_key() == other._adj.content_key())
+        return NotImplemented
 
-                if neighbor not in path_list:
-                    stack.append(neighbor)
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('frozen graph is read-only')
 
-        return None
+    add_vertex = add_edge = add_edges_bulk = _read_only
+    remove_edge = remove_vertex = _read_only
 
-    def has_cycle(self):
+    def _csr_arrays(self) -> tuple:
         """
-        Return True if graph contains a cycle, False otherwise
+        Returns the stored (names, offsets, targets)
         """
-        vertices = self.get_vertices()
-
-        for each in vertices:
+        return self._names, self._adj.offsets, self._adj.targets
 
-            if self.bfs_helper(each):
-                return True
-
-        return False
-
-    def bfs_helper(self, v_start) -> bool:
+    def freeze(self):
         """
-        BFS helper function for has_cycle() method.
-        Takes a starting point and a list of bools indicating
-        vertices that have been visited. Updates dict to True
-        for any vertices visited during the dfs.
+        Returns the graph itself, which is already frozen
         """
+        return self
 
-        if v_start not in self.adj_list:
-            return False
-
-        vertices = self.get_vertices()
+    def _sorted_neighbors(self, v_id):
+        """
+        Returns the stored row of v_id, which is already in
+        alphabetical order
+        """
+        adj = self._adj
+        return adj.targets[adj.offsets[v_id]:adj.offsets[v_id + 1]]
 
-        # initialize visit tracking dict
-        visited_dict = {}
-        for each in vertices:
-            visited_dict[each] = False
+    def get_vertices(self) -> list:
+        """
+        Return list of vertices in the graph (any order)
+        """
+        return list(self._names)
 
-        # initialize parent tracking dict
-        parent_dict = {}
-        for each in vertices:
-            parent_dict[each] = None
 
-        visited_dict[v_start] = True
+class _AdjacencyView(Mapping):
+    """
+    Read-only name-based view of an UndirectedGraph's
+    adjacency, in the old adj_list format
+    """
 
-        # push starting vertice into queue
-        current = v_start
-        queue = deque([current])
+    def __init__(self, graph):
+        self._graph = graph
 
-        # while queue not empty
-        while queue:
-            current = queue.popleft()
+    def __getitem__(self, v):
+        graph = self._graph
+        v_id = graph._ids[v]
+        names = graph._names
+        return [names[n_id] for n_id in graph._adj[v_id]]
 
-            for neighbor in self.adj_list[current]:
-                # case: neighbor has not yet been visited
-                if not visited_dict[neighbor]:
-                    visited_dict[neighbor] = True
-                    queue.append(neighbor)
-                    parent_dict[neighbor] = current
+    def __iter__(self):
+        return iter(self._graph.get_vertices())
 
-                # case: neighbor has already been visited
-                # current's parent is not the neighbor
-                elif parent_dict[current] != neighbor:
-                    return True
+    def __len__(self):
+        return len(self._graph._ids)
 
-        return False
+    def __contains__(self, v):
+        return v in self._graph._ids
 
 
 if __name__ == '__main__':